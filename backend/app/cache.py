@@ -0,0 +1,356 @@
+# Standard library imports
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+# Third-party imports
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorCollection, AsyncIOMotorDatabase
+
+# Local imports
+from .database import CATEGORY_COLLATION, bump_catalog_version, get_catalog_version, catalog_write_clock
+from .snapshot import catalog_snapshot
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Cache Configuration
+CACHE_MAX_ENTRIES = 1024     # Upper bound on cached responses (LRU eviction beyond this)
+CACHE_TTL_SECONDS = 60.0     # Safety net so entries never outlive a missed invalidation
+CATALOG_VERSION_REFRESH_SECONDS = 5.0  # How often a worker re-reads the shared catalog version
+
+# Cache tags
+# Every entry is stored with the tags of the data it was built from,
+# so a write only drops the entries that could have changed.
+TAG_ALL_PRODUCTS = "products:all"  # Unfiltered product listings
+TAG_CATEGORIES = "categories"      # Category listings
+
+def product_tag(product_id: str) -> str:
+    """Tag for responses built from a single product document"""
+    return f"product:{product_id}"
+
+def category_tag(category: str) -> str:
+    """Tag for product listings filtered by a category (case-insensitive)"""
+    return f"category:{category.casefold()}"
+
+class CatalogCache:
+    """
+    Bounded LRU cache with per-entry TTL and tag based invalidation
+
+    Values are stored as-is and must not be mutated by callers.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (expires_at, value, tags), ordered from least to most recently used
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, frozenset]]" = OrderedDict()
+        # Bumped on every invalidation so in-flight loads can't store stale data
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached value
+
+        Args:
+            key: Cache key describing the query shape
+
+        Returns:
+            Optional[Any]: Cached value, or None on a miss or expired entry
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            # Expired entries count as misses and are dropped eagerly
+            del self._entries[key]
+            self.misses += 1
+            return None
+        # Mark as most recently used
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        tags: Iterable[str] = (),
+        generation: Optional[int] = None
+    ) -> None:
+        """
+        Store a value
+
+        Args:
+            key: Cache key describing the query shape
+            value: Value to cache
+            tags: Tags used for invalidation
+            generation: Generation observed before the value was loaded;
+                the value is discarded if an invalidation happened since
+        """
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value, frozenset(tags))
+        self._entries.move_to_end(key)
+        # Evict least recently used entries beyond the size bound
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """
+        Drop every entry carrying any of the given tags
+
+        Args:
+            tags: Tags to invalidate
+
+        Returns:
+            int: Number of entries removed
+        """
+        self.generation += 1
+        targets = set(tags)
+        stale = [key for key, (_, _, entry_tags) in self._entries.items() if entry_tags & targets]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        self.generation += 1
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters
+
+        Returns:
+            dict: Entry count, hit/miss counters and hit ratio
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+class CategoryResolver:
+    """
+    In-memory, case-insensitive map from category names and slugs to
+    canonical category names
+
+    The map is loaded lazily from the categories collection and dropped
+    whenever a category is written, so lookups normally never touch MongoDB.
+    """
+
+    def __init__(self):
+        # casefolded name or slug -> canonical category name
+        self._names: Optional[Dict[str, str]] = None
+        # Bumped on invalidation so a load racing a write isn't kept
+        self._generation = 0
+
+    def invalidate(self) -> None:
+        """Drop the map so it is rebuilt on the next lookup"""
+        self._generation += 1
+        self._names = None
+
+    async def _load(self, collection: AsyncIOMotorCollection) -> Dict[str, str]:
+        """Build the lookup map from the categories collection"""
+        generation = self._generation
+        names: Dict[str, str] = {}
+        docs = await collection.find({}, {"name": 1, "slug": 1}).to_list(length=None)
+        # Slugs first so an exact name always wins over another category's slug
+        for doc in docs:
+            if doc.get("slug"):
+                names[doc["slug"].casefold()] = doc["name"]
+        for doc in docs:
+            names[doc["name"].casefold()] = doc["name"]
+        if generation == self._generation:
+            self._names = names
+        return names
+
+    async def resolve(self, collection: AsyncIOMotorCollection, value: str) -> Optional[str]:
+        """
+        Resolve a user supplied category name or slug
+
+        Args:
+            collection: Categories collection used to (re)load the map
+            value: Category name or slug in any letter case
+
+        Returns:
+            Optional[str]: Canonical category name, or None if it doesn't exist
+        """
+        names = self._names
+        if names is None:
+            names = await self._load(collection)
+        name = names.get(value.casefold())
+        if name is not None:
+            return name
+        
+        # Fall back to the case-insensitive name index in case the map is
+        # stale, e.g. the category was created by another worker
+        doc = await collection.find_one({"name": value}, {"name": 1}, collation=CATEGORY_COLLATION)
+        if doc is None:
+            return None
+        names[value.casefold()] = doc["name"]
+        return doc["name"]
+
+class CatalogVersion:
+    """
+    This worker's view of the shared catalog version
+
+    The version lives in db.counters and is bumped by every catalog write.
+    Workers re-read it at most every CATALOG_VERSION_REFRESH_SECONDS, so
+    ETag checks normally don't touch MongoDB at all.
+    """
+
+    def __init__(self, refresh_seconds: float = CATALOG_VERSION_REFRESH_SECONDS):
+        self.value = 0
+        self.refresh_seconds = refresh_seconds
+        self._checked_at: Optional[float] = None
+
+    def observe(self, version: int) -> bool:
+        """
+        Record a version seen in the database
+
+        Args:
+            version: Catalog version read or written by this worker
+
+        Returns:
+            bool: True if the version moved forward
+        """
+        if version <= self.value:
+            return False
+        self.value = version
+        return True
+
+    async def refresh(self, database: AsyncIOMotorDatabase, force: bool = False) -> None:
+        """
+        Re-read the shared version if the local copy is old enough
+
+        A newer version means another worker changed the catalog, so every
+        local cache entry is dropped. The version is read from the primary
+        in a causal session whose operation time covers that worker's
+        write; it is recorded in catalog_write_clock first, so entries
+        refilled from a secondary can't predate the write.
+
+        Args:
+            database: Database holding the counters collection
+            force: Re-read even if the local copy is fresh
+        """
+        now = time.monotonic()
+        if not force and self._checked_at is not None and now - self._checked_at < self.refresh_seconds:
+            return
+        self._checked_at = now
+        async with await database.client.start_session(causal_consistency=True) as session:
+            version = await get_catalog_version(database, session)
+            catalog_write_clock.observe(session.operation_time)
+        if self.observe(version):
+            self._drop_local_entries()
+
+    def observe_own_bump(self, previous: int, version: int) -> None:
+        """
+        Record the version returned by this worker's own bump
+
+        A jump of more than one means another worker wrote in between. Its
+        write may have made local entries stale that ours didn't touch, so
+        everything is dropped before the new version (and ETag) is adopted.
+
+        Args:
+            previous: Version this worker had observed before bumping
+            version: Version returned by the bump
+        """
+        if version > previous + 1:
+            self._drop_local_entries()
+        self.observe(version)
+
+    def _drop_local_entries(self) -> None:
+        """Drop every catalog read cached by this worker"""
+        catalog_cache.clear()
+        category_resolver.invalidate()
+        catalog_snapshot.invalidate()
+
+    def etag(self) -> str:
+        """
+        Get the strong ETag for catalog responses at the current version
+
+        Returns:
+            str: Quoted entity tag
+        """
+        return f'"catalog-{self.value}"'
+
+    def reset(self) -> None:
+        """Forget the observed version (used when switching databases)"""
+        self.value = 0
+        self._checked_at = None
+
+# Shared cache for catalog read routes
+catalog_cache = CatalogCache()
+
+# Shared category name resolver
+category_resolver = CategoryResolver()
+
+# Shared catalog version used for ETags
+catalog_version = CatalogVersion()
+
+async def invalidate_products(
+    database: AsyncIOMotorDatabase,
+    product_ids: Iterable[str] = (),
+    categories: Iterable[Optional[str]] = (),
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> None:
+    """
+    Invalidate cached reads affected by a product write
+
+    The category list is always dropped too, since it carries the product
+    counts of each category.
+
+    Args:
+        database: Database holding the counters collection
+        product_ids: ObjectId strings of the written products
+        categories: Category names the products were in before and after the write
+        session: Optional session the write belongs to
+    """
+    # Bump before dropping entries: the bump advances the catalog write
+    # clock, so secondary reads refilling them wait for this write
+    previous = catalog_version.value
+    version = await bump_catalog_version(database, session)
+    tags = [TAG_ALL_PRODUCTS, TAG_CATEGORIES]
+    tags.extend(product_tag(product_id) for product_id in product_ids)
+    tags.extend(category_tag(name) for name in categories if name)
+    removed = catalog_cache.invalidate_tags(*tags)
+    catalog_snapshot.invalidate(database)
+    logger.debug(f"Invalidated {removed} cached product reads")
+    catalog_version.observe_own_bump(previous, version)
+
+async def invalidate_categories(
+    database: AsyncIOMotorDatabase,
+    names: Iterable[Optional[str]] = (),
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> None:
+    """
+    Invalidate cached reads affected by a category write
+
+    Args:
+        database: Database holding the counters collection
+        names: Category names before and after the write
+        session: Optional session the write belongs to
+    """
+    # Bump first, see invalidate_products
+    previous = catalog_version.value
+    version = await bump_catalog_version(database, session)
+    tags = [TAG_CATEGORIES]
+    tags.extend(category_tag(name) for name in names if name)
+    removed = catalog_cache.invalidate_tags(*tags)
+    category_resolver.invalidate()
+    catalog_snapshot.invalidate(database)
+    logger.debug(f"Invalidated {removed} cached category reads")
+    catalog_version.observe_own_bump(previous, version)
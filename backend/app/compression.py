@@ -0,0 +1,256 @@
+# Standard library imports
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Third-party imports
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Local imports
+from .utils.encoding import choose_encoding, compress, variant_etag
+from .utils.conditional import etag_matches
+
+# Compression Configuration
+COMPRESSION_MIN_BYTES = 1024            # Smaller bodies aren't worth the CPU
+COMPRESSION_MEMO_MAX_BYTES = 32 * 1024 * 1024  # Budget for memoized compressed bodies
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/"
+)
+
+class CompressionStats:
+    """Counters describing how much the middleware compressed"""
+
+    def __init__(self):
+        self.responses = 0            # Responses sent compressed
+        self.bytes_in = 0             # Uncompressed bytes of those responses
+        self.bytes_out = 0            # Compressed bytes actually sent
+        self.cpu_seconds = 0.0        # CPU time spent compressing
+        self.memo_hits = 0            # Compressed bodies reused from the memo
+        self.memo_misses = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the counters with derived ratios
+
+        Returns:
+            dict: Counters plus compression ratio and memo hit ratio
+        """
+        lookups = self.memo_hits + self.memo_misses
+        return {
+            "responses": self.responses,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "compression_ratio": round(self.bytes_in / self.bytes_out, 3) if self.bytes_out else 0.0,
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "memo_hits": self.memo_hits,
+            "memo_misses": self.memo_misses,
+            "memo_hit_ratio": round(self.memo_hits / lookups, 4) if lookups else 0.0
+        }
+
+class CompressedBodyMemo:
+    """LRU of compressed bodies bounded by their total size"""
+
+    def __init__(self, max_bytes: int = COMPRESSION_MEMO_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[Tuple[bytes, str], bytes]" = OrderedDict()
+
+    def get(self, key: Tuple[bytes, str]) -> Optional[bytes]:
+        """Get a memoized body and mark it most recently used"""
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    def set(self, key: Tuple[bytes, str], body: bytes) -> None:
+        """Memoize a body, evicting least recently used ones over budget"""
+        if len(body) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._entries[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def clear(self) -> None:
+        """Drop all memoized bodies"""
+        self._entries.clear()
+        self.size = 0
+
+# Shared state used by the middleware and the stats endpoint
+compression_stats = CompressionStats()
+compressed_memo = CompressedBodyMemo()
+
+def _strip_variant_suffixes(if_none_match: str) -> str:
+    """
+    Map compressed-variant ETags back to the ones routes produce
+
+    Routes only know the ETag of the uncompressed representation, so a
+    client revalidating "catalog-5-gzip" has to be asked about "catalog-5".
+
+    Args:
+        if_none_match: Raw If-None-Match header
+
+    Returns:
+        str: Header with -br/-gzip suffixes removed
+    """
+    tags = []
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        for encoding in ("br", "gzip"):
+            suffix = f'-{encoding}"'
+            if tag.endswith(suffix):
+                tag = tag[:-len(suffix)] + '"'
+        tags.append(tag)
+    return ", ".join(tags)
+
+class CompressionMiddleware:
+    """
+    Negotiated gzip/brotli compression for API responses
+
+    Only complete (non-streaming) responses above COMPRESSION_MIN_BYTES with
+    a compressible content type are compressed. Compressed bodies of
+    successful GETs are memoized by body hash, so identical responses
+    (e.g. cached catalog pages) are compressed only once.
+    """
+
+    def __init__(self, app: ASGIApp, min_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.min_size = min_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding"))
+        if encoding is None or request_headers.get("range"):
+            await self.app(scope, receive, send)
+            return
+
+        # Let routes compare If-None-Match against their own ETags. The scope
+        # is changed in place: outer middleware reads the matched route from it
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match:
+            headers = [(name, value) for name, value in scope["headers"] if name != b"if-none-match"]
+            headers.append((b"if-none-match", _strip_variant_suffixes(if_none_match).encode("latin-1")))
+            scope["headers"] = headers
+
+        responder = _CompressionResponder(send, encoding, self.min_size, scope["method"], if_none_match)
+        await self.app(scope, receive, responder)
+
+class _CompressionResponder:
+    """Send wrapper deciding per response whether to compress"""
+
+    def __init__(self, send: Send, encoding: str, min_size: int, method: str, if_none_match: Optional[str] = None):
+        self.send = send
+        self.encoding = encoding
+        self.min_size = min_size
+        self.method = method
+        self.if_none_match = if_none_match  # As sent, before variant suffixes were stripped
+        self.start: Optional[Message] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            # Hold the start message until we've seen the body
+            self.start = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        headers = MutableHeaders(raw=list(self.start["headers"]))
+        if not self._should_compress(headers, body, message.get("more_body", False)):
+            # Streaming or unsuitable response, forward untouched
+            self.passthrough = True
+            if self.start["status"] == 304:
+                await self.send(self._not_modified_start(headers))
+            else:
+                await self.send(self.start)
+            await self.send(message)
+            return
+
+        # Only successful, storable GETs are worth memoizing
+        cacheable = (
+            self.method == "GET"
+            and self.start["status"] == 200
+            and "no-store" not in headers.get("cache-control", "")
+        )
+        compressed = self._compress(body, memoize=cacheable)
+        headers["Content-Encoding"] = self.encoding
+        headers["Content-Length"] = str(len(compressed))
+        headers.add_vary_header("Accept-Encoding")
+        if "etag" in headers:
+            headers["ETag"] = variant_etag(headers["etag"], self.encoding)
+        await self.send({**self.start, "headers": headers.raw})
+        await self.send({"type": "http.response.body", "body": compressed})
+
+    def _not_modified_start(self, headers: MutableHeaders) -> Message:
+        """Give a 304 the ETag of the representation the client revalidated"""
+        etag = headers.get("etag")
+        if etag:
+            # Clients holding the compressed 200 revalidate its variant ETag
+            variant = variant_etag(etag, self.encoding)
+            if etag_matches(self.if_none_match, variant):
+                headers["ETag"] = variant
+        headers.add_vary_header("Accept-Encoding")
+        return {**self.start, "headers": headers.raw}
+
+    def _should_compress(self, headers: MutableHeaders, body: bytes, more_body: bool) -> bool:
+        """Decide whether this response gets compressed"""
+        if more_body:
+            # Streaming responses are never buffered
+            return False
+        if "content-encoding" in headers:
+            return False
+        if len(body) < self.min_size:
+            return False
+        return _is_compressible(headers.get("content-type", ""))
+
+    def _compress(self, body: bytes, memoize: bool) -> bytes:
+        """Compress the body, reusing a memoized result when possible"""
+        stats = compression_stats
+        key = None
+        if memoize:
+            key = (hashlib.blake2b(body, digest_size=16).digest(), self.encoding)
+            compressed = compressed_memo.get(key)
+            if compressed is not None:
+                stats.memo_hits += 1
+                self._record(stats, body, compressed, 0.0)
+                return compressed
+            stats.memo_misses += 1
+
+        started = time.thread_time()
+        compressed = compress(body, self.encoding)
+        self._record(stats, body, compressed, time.thread_time() - started)
+        if key is not None:
+            compressed_memo.set(key, compressed)
+        return compressed
+
+    @staticmethod
+    def _record(stats: CompressionStats, body: bytes, compressed: bytes, cpu_seconds: float) -> None:
+        """Update the compression counters"""
+        stats.responses += 1
+        stats.bytes_in += len(body)
+        stats.bytes_out += len(compressed)
+        stats.cpu_seconds += cpu_seconds
+
+def _is_compressible(content_type: str) -> bool:
+    """Check whether a content type benefits from compression"""
+    return content_type.startswith(COMPRESSIBLE_TYPES)
@@ -1,69 +1,184 @@
+# Standard library imports
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
 # Third-party imports
-from motor.motor_asyncio import AsyncIOMotorClient
+from bson.timestamp import Timestamp
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorClientSession, AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne, monitoring
 from pymongo.database import Database
-from pymongo.collection import Collection
-import logging
+from pymongo.read_preferences import SecondaryPreferred
+
+# Local imports
+from .metrics import mongo_command_metrics
+from .slow_queries import slow_query_recorder
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # Database Configuration
-MONGODB_URI: str = "mongodb://localhost:27017"
-DB_NAME: str = "laxmi_bakery"
+MONGODB_URI: str = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
+DB_NAME: str = os.getenv("MONGODB_DB_NAME", "laxmi_bakery")
 
-try:
-    # Initialize MongoDB client
-    logger.debug(f"Connecting to MongoDB at {MONGODB_URI}")
-    client: AsyncIOMotorClient = AsyncIOMotorClient(
-        MONGODB_URI,
-        serverSelectionTimeoutMS=5000  # 5 second timeout for server selection
-    )
-    
-    # Test connection
-    client.admin.command('ping')
-    logger.info("Successfully connected to MongoDB")
-except Exception as e:
-    logger.error(f"Failed to connect to MongoDB: {str(e)}")
-    raise
+# Connection Pool Configuration
+# Every uvicorn worker has its own pool, so the server sees up to
+# workers * MONGODB_MAX_POOL_SIZE connections.
+MONGODB_MAX_POOL_SIZE: int = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+MONGODB_MIN_POOL_SIZE: int = int(os.getenv("MONGODB_MIN_POOL_SIZE", "0"))
+MONGODB_MAX_IDLE_TIME_MS: int = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000"))  # Recycle idle connections after 5 minutes
+MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "5000"))  # Fail fast when the pool is exhausted
+MONGODB_COMPRESSORS: str = os.getenv("MONGODB_COMPRESSORS", "zlib")  # e.g. "zstd,snappy,zlib" if those packages are installed
+MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 5000
 
-# Get database instance
-db = client[DB_NAME]
+# Read Preference Configuration
+# Anonymous catalog reads may be served by a secondary lagging the primary
+# by at most this many seconds (MongoDB doesn't accept less than 90).
+# Admin reads stay on the client default, the primary.
+CATALOG_MAX_STALENESS_SECONDS: int = max(90, int(os.getenv("MONGODB_CATALOG_MAX_STALENESS_SECONDS", "90")))
+CATALOG_READ_PREFERENCE = SecondaryPreferred(max_staleness=CATALOG_MAX_STALENESS_SECONDS)
 
-# Collection definitions
-# Each collection represents a different data type in our application
-users = db.users           # User accounts and authentication
-products = db.products     # Bakery products
-categories = db.categories # Product categories
+# Case-insensitive collation used for category name lookups
+CATEGORY_COLLATION = {"locale": "en", "strength": 2}
 
-async def init_db() -> None:
+class PoolStats(monitoring.ConnectionPoolListener):
     """
-    Initialize database with required indexes
-    
-    Creates indexes for better query performance and data integrity
-    Should be called when application starts
+    Connection pool counters, fed by PyMongo's pool events
+
+    Motor runs pool checkouts on its executor threads, so a checkout's
+    start and end are paired up per thread to measure the wait time.
     """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started: Dict[int, float] = {}   # thread id -> checkout start
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checked_in = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.connections_created = 0
+        self.connections_closed = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the counters with derived values
+
+        Returns:
+            dict: Checkouts, wait times and connection counts
+        """
+        with self._lock:
+            return {
+                "max_pool_size": MONGODB_MAX_POOL_SIZE,
+                "connections_open": self.connections_created - self.connections_closed,
+                "connections_in_use": self.checkouts - self.checked_in,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "checkout_wait_seconds_total": round(self.wait_seconds_total, 6),
+                "checkout_wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+                "checkout_wait_seconds_max": round(self.wait_seconds_max, 6)
+            }
+
+    def _finish_wait(self) -> Optional[float]:
+        """Pop the calling thread's checkout start and return the wait"""
+        started = self._started.pop(threading.get_ident(), None)
+        return None if started is None else time.perf_counter() - started
+
+    def connection_check_out_started(self, event) -> None:
+        self._started[threading.get_ident()] = time.perf_counter()
+
+    def connection_checked_out(self, event) -> None:
+        wait = self._finish_wait()
+        with self._lock:
+            self.checkouts += 1
+            if wait is not None:
+                self.wait_seconds_total += wait
+                self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+    def connection_check_out_failed(self, event) -> None:
+        self._finish_wait()
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event) -> None:
+        with self._lock:
+            self.checked_in += 1
+
+    def connection_created(self, event) -> None:
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_closed(self, event) -> None:
+        with self._lock:
+            self.connections_closed += 1
+
+    # Pool level events carry nothing we count
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_ready(self, event) -> None:
+        pass
+
+# Pool counters for this worker process
+pool_stats = PoolStats()
+
+# Client and database of this worker process
+# Created by connect_db() from the application lifespan, i.e. after uvicorn
+# has started the worker, never at import time.
+client: Optional[AsyncIOMotorClient] = None
+db: Optional[AsyncIOMotorDatabase] = None
+
+async def connect_db() -> AsyncIOMotorDatabase:
+    """
+    Create this process's MongoDB client and verify the connection
+
+    Returns:
+        AsyncIOMotorDatabase: The application database
+
+    Raises:
+        Exception: If MongoDB can't be reached
+    """
+    global client, db
+    if db is not None:
+        return db
+    
+    logger.debug(f"Connecting to MongoDB at {MONGODB_URI}")
+    new_client = AsyncIOMotorClient(
+        MONGODB_URI,
+        maxPoolSize=MONGODB_MAX_POOL_SIZE,
+        minPoolSize=MONGODB_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGODB_MAX_IDLE_TIME_MS,
+        waitQueueTimeoutMS=MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+        compressors=MONGODB_COMPRESSORS or None,
+        serverSelectionTimeoutMS=MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        event_listeners=[pool_stats, mongo_command_metrics, slow_query_recorder]
+    )
     try:
-        logger.debug("Starting database initialization")
-        
-        # Create unique index on user email
-        logger.debug("Creating user email index")
-        await users.create_index("email", unique=True)
-        
-        # Create indexes for product searches
-        logger.debug("Creating product indexes")
-        await products.create_index("name")
-        await products.create_index("category_id")  # Changed from category to category_id
-        await products.create_index([("name", "text"), ("description", "text")])  # Text search index
-        
-        # Create unique index on category name
-        logger.debug("Creating category name index")
-        await categories.create_index("name", unique=True)
-        
-        logger.info("Database initialized successfully")
+        # Awaited, so a failure stops startup instead of being logged and ignored
+        await new_client.admin.command("ping")
     except Exception as e:
-        logger.error(f"Error initializing database: {str(e)}")
+        logger.error(f"Failed to connect to MongoDB: {str(e)}")
+        new_client.close()
         raise
+    logger.info("Successfully connected to MongoDB")
+    
+    client = new_client
+    db = client[DB_NAME]
+    return db
 
 def close_db() -> None:
     """
@@ -71,18 +186,450 @@ def close_db() -> None:
     
     Should be called when application shuts down
     """
+    global client, db
+    if client is None:
+        return
     try:
         client.close()
         logger.info("Database connection closed")
     except Exception as e:
-        logger.error(f"Error closing database connection: {str(e)}") 
+        logger.error(f"Error closing database connection: {str(e)}")
+    finally:
+        client = None
+        db = None
+
+# Product number allocation
+# Product numbers come from the "product_id" sequence in db.counters.
+# Instead of one $inc round trip per product, each worker reserves a
+# block of numbers at a time and hands them out from memory (hi/lo).
+# Numbers left in a block when a worker stops are simply skipped, and
+# the unique index on products.product_id guards against collisions.
+PRODUCT_ID_SEQUENCE = "product_id"
+PRODUCT_ID_BLOCK_SIZE = 100
+
+async def reserve_product_ids(database: Database, count: int) -> range:
+    """
+    Reserve a contiguous range of product numbers with a single $inc
+
+    Args:
+        database: Database holding the counters collection
+        count: Number of product numbers to reserve
+
+    Returns:
+        range: Reserved product numbers
+    """
+    counter = await database.counters.find_one_and_update(
+        {"_id": PRODUCT_ID_SEQUENCE},
+        {"$inc": {"seq": count}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return range(counter["seq"] - count + 1, counter["seq"] + 1)
+
+async def advance_product_id_sequence(database: Database, at_least: int) -> int:
+    """
+    Move the sequence past product numbers that are about to be assigned explicitly
+
+    Must run before those numbers are inserted. Numbers up to the returned
+    value may already sit in a block some worker reserved, so callers must
+    not use them.
+
+    Args:
+        database: Database holding the counters collection
+        at_least: Highest product number about to be used
+
+    Returns:
+        int: Sequence value before the advance
+    """
+    counter = await database.counters.find_one_and_update(
+        {"_id": PRODUCT_ID_SEQUENCE},
+        {"$max": {"seq": at_least}},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
+    )
+    return counter["seq"] if counter else 0
+
+class ProductIdAllocator:
+    """
+    Per-process hi/lo allocator for product numbers
+    """
+
+    def __init__(self, block_size: int = PRODUCT_ID_BLOCK_SIZE):
+        self.block_size = block_size
+        self._next = 0
+        self._limit = 0            # First number not in the current block
+        self._database_name: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    async def allocate(self, database: Database, count: int = 1) -> List[int]:
+        """
+        Hand out product numbers, reserving a new block when this one runs out
+
+        Args:
+            database: Database holding the counters collection
+            count: Number of product numbers needed
+
+        Returns:
+            List[int]: Unused product numbers in ascending order
+        """
+        async with self._lock:
+            if database.name != self._database_name:
+                # Numbers reserved in another database mean nothing here
+                self.reset()
+                self._database_name = database.name
+            ids = []
+            while len(ids) < count:
+                if self._next >= self._limit:
+                    # Large requests reserve everything they need at once
+                    block = await reserve_product_ids(database, max(self.block_size, count - len(ids)))
+                    self._next, self._limit = block.start, block.stop
+                take = min(count - len(ids), self._limit - self._next)
+                ids.extend(range(self._next, self._next + take))
+                self._next += take
+            return ids
+
+    def reset(self) -> None:
+        """Forget the reserved block (used when switching databases)"""
+        self._next = self._limit = 0
+        self._database_name = None
+
+# Shared allocator for this worker process
+product_id_allocator = ProductIdAllocator()
+
+async def get_next_product_id(database: Optional[Database] = None) -> int:
+    """
+    Get the next product number
+
+    Args:
+        database: Database holding the counters collection (defaults to db)
+
+    Returns:
+        int: Unused product number
+    """
+    ids = await product_id_allocator.allocate(database if database is not None else db)
+    return ids[0]
+
+# Available product counters
+# Totals for pagination are kept in db.counters (next to the product_id
+# sequence) so listing requests don't have to run count_documents.
+AVAILABLE_COUNT_ID = "available_products"
 
-# Add a function to get the next product_id
-async def get_next_product_id():
-    counter = await db.counters.find_one_and_update(
-        {"_id": "product_id"},
+def available_count_id(category: Optional[str] = None) -> str:
+    """
+    Get the counters document id for a category's available product count
+
+    Args:
+        category: Category name, or None for the global count
+
+    Returns:
+        str: Document id in db.counters
+    """
+    return f"{AVAILABLE_COUNT_ID}:{category}" if category else AVAILABLE_COUNT_ID
+
+async def get_available_product_count(database: Database, category: Optional[str] = None) -> int:
+    """
+    Get the number of available products, globally or in one category
+
+    The counter is seeded with a single count_documents the first time it
+    is read; afterwards it is maintained by the product write paths. A
+    write landing between the count and the seed is lost, which
+    reconcile_available_counts corrects.
+
+    Args:
+        database: Database holding the products and counters collections
+        category: Optional category name
+
+    Returns:
+        int: Number of available products
+    """
+    counter_id = available_count_id(category)
+    counter = await database.counters.find_one({"_id": counter_id})
+    if counter is not None:
+        return counter["count"]
+    
+    # Seed the counter from the collection
+    query = {"available": True}
+    if category:
+        query["category"] = category
+    count = await database.products.count_documents(query)
+    await database.counters.update_one(
+        {"_id": counter_id},
+        {"$setOnInsert": {"count": count}},
+        upsert=True
+    )
+    return count
+
+async def adjust_available_product_counts(
+    database: Database,
+    before: Optional[dict] = None,
+    after: Optional[dict] = None,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> None:
+    """
+    Update product counters for a product write
+
+    Args:
+        database: Database holding the counters and categories collections
+        before: Product document before the write (None for inserts)
+        after: Product document after the write (None for deletes)
+        session: Optional session the write belongs to
+    """
+    await apply_available_count_changes(database, [(before, after)], session)
+
+async def apply_available_count_changes(
+    database: Database,
+    changes: Iterable[Tuple[Optional[dict], Optional[dict]]],
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> None:
+    """
+    Update product counters for many product writes at once
+
+    Maintains both the available product counters in db.counters and the
+    product_count/available_count fields on each category document. All
+    changes are netted per counter and sent as one bulk write per collection.
+
+    Args:
+        database: Database holding the counters and categories collections
+        changes: (before, after) document pairs; None for inserted or deleted sides
+        session: Optional session the writes belong to
+    """
+    deltas: Dict[str, int] = {}
+    # category name -> {"product_count": delta, "available_count": delta}
+    category_deltas: Dict[str, Dict[str, int]] = {}
+    for before, after in changes:
+        # Undo the contribution of the old document and add the new one
+        for doc, sign in ((before, -1), (after, 1)):
+            if not doc:
+                continue
+            available = doc.get("available", True)
+            if doc.get("category"):
+                counts = category_deltas.setdefault(doc["category"], {"product_count": 0, "available_count": 0})
+                counts["product_count"] += sign
+                if available:
+                    counts["available_count"] += sign
+            if available:
+                counter_ids = [available_count_id()]
+                if doc.get("category"):
+                    counter_ids.append(available_count_id(doc["category"]))
+                for counter_id in counter_ids:
+                    deltas[counter_id] = deltas.get(counter_id, 0) + sign
+    
+    operations = [
+        # No upsert: counters that were never seeded are seeded on first read
+        UpdateOne({"_id": counter_id}, {"$inc": {"count": delta}})
+        for counter_id, delta in deltas.items()
+        if delta
+    ]
+    if operations:
+        await database.counters.bulk_write(operations, ordered=False, session=session)
+    
+    category_operations = [
+        UpdateOne({"name": name}, {"$inc": {field: delta for field, delta in counts.items() if delta}})
+        for name, counts in category_deltas.items()
+        if any(counts.values())
+    ]
+    if category_operations:
+        await database.categories.bulk_write(category_operations, ordered=False, session=session)
+
+async def reconcile_category_counts(database: Database) -> int:
+    """
+    Recompute product_count/available_count of every category
+
+    The counts are maintained incrementally by the product write paths;
+    this corrects any drift (e.g. from writes made outside the API) with
+    one $group aggregation over the products collection.
+
+    Args:
+        database: Database holding the products and categories collections
+
+    Returns:
+        int: Number of categories whose counts were corrected
+    """
+    pipeline = [
+        {"$group": {
+            "_id": "$category",
+            "product_count": {"$sum": 1},
+            "available_count": {"$sum": {"$cond": [{"$eq": ["$available", True]}, 1, 0]}}
+        }}
+    ]
+    actual = {
+        group["_id"]: group
+        async for group in database.products.aggregate(pipeline)
+    }
+    categories = await database.categories.find(
+        {}, {"name": 1, "product_count": 1, "available_count": 1}
+    ).to_list(length=None)
+    
+    operations = []
+    for category in categories:
+        group = actual.get(category["name"], {})
+        counts = {
+            "product_count": group.get("product_count", 0),
+            "available_count": group.get("available_count", 0)
+        }
+        # Only write categories that drifted
+        if any(category.get(field) != value for field, value in counts.items()):
+            operations.append(UpdateOne({"_id": category["_id"]}, {"$set": counts}))
+    if operations:
+        await database.categories.bulk_write(operations, ordered=False)
+        logger.info(f"Reconciled product counts of {len(operations)} categories")
+    return len(operations)
+
+async def reconcile_available_counts(database: Database) -> int:
+    """
+    Recompute the available product counters in db.counters
+
+    Corrects drift from writes made outside the API and from increments
+    lost while a counter was being seeded. Only counters that have been
+    seeded are written; the others are seeded on their first read.
+
+    Args:
+        database: Database holding the products and counters collections
+
+    Returns:
+        int: Number of counters that were corrected
+    """
+    pipeline = [
+        {"$match": {"available": True}},
+        {"$group": {"_id": "$category", "count": {"$sum": 1}}}
+    ]
+    actual = {available_count_id(): 0}
+    async for group in database.products.aggregate(pipeline):
+        actual[available_count_id()] += group["count"]
+        if group["_id"]:
+            actual[available_count_id(group["_id"])] = group["count"]
+    counters = await database.counters.find(
+        {"_id": {"$regex": f"^{AVAILABLE_COUNT_ID}(:|$)"}}
+    ).to_list(length=None)
+    
+    operations = [
+        UpdateOne({"_id": counter["_id"]}, {"$set": {"count": actual.get(counter["_id"], 0)}})
+        for counter in counters
+        # Only write counters that drifted
+        if counter.get("count") != actual.get(counter["_id"], 0)
+    ]
+    if operations:
+        await database.counters.bulk_write(operations, ordered=False)
+        logger.info(f"Reconciled {len(operations)} available product counters")
+    return len(operations)
+
+# Catalog version
+# Bumped by every product/category write; ETags on catalog reads are
+# derived from it so unchanged data can be answered with 304.
+CATALOG_VERSION_ID = "catalog_version"
+
+async def bump_catalog_version(
+    database: Database,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> int:
+    """
+    Increment the catalog version
+
+    Every catalog write ends with this bump, so its operation time covers
+    the write itself and is recorded in catalog_write_clock.
+
+    Args:
+        database: Database holding the counters collection
+        session: Optional session of the write; an explicit one is started
+            otherwise, since implicit sessions don't expose operation times
+
+    Returns:
+        int: The new catalog version
+    """
+    if session is None:
+        async with await database.client.start_session() as own_session:
+            return await bump_catalog_version(database, own_session)
+    counter = await database.counters.find_one_and_update(
+        {"_id": CATALOG_VERSION_ID},
         {"$inc": {"seq": 1}},
         upsert=True,
-        return_document=True
+        return_document=True,
+        session=session
     )
-    return counter["seq"] 
\ No newline at end of file
+    catalog_write_clock.observe(session.operation_time)
+    return counter["seq"]
+
+async def get_catalog_version(
+    database: Database,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> int:
+    """
+    Get the current catalog version
+
+    Args:
+        database: Database holding the counters collection
+        session: Optional session the read belongs to
+
+    Returns:
+        int: Current catalog version (0 before the first write)
+    """
+    counter = await database.counters.find_one({"_id": CATALOG_VERSION_ID}, session=session)
+    return counter["seq"] if counter else 0
+
+# Catalog read routing
+# Anonymous catalog reads go to secondaries (CATALOG_READ_PREFERENCE). To
+# keep the catalog cache from being refilled with data older than the
+# write that just invalidated it, those reads run in a causally consistent
+# session advanced to the newest catalog write this worker knows about;
+# a secondary then only answers once it has applied that write.
+
+class CatalogWriteClock:
+    """
+    Cluster time of the newest catalog write known to this worker
+
+    Fed by this worker's catalog version bumps and by the change stream
+    events of other workers' writes. Stays empty on a standalone mongod,
+    which reports no cluster times and has no secondaries anyway.
+    """
+
+    def __init__(self):
+        self.operation_time: Optional[Timestamp] = None
+
+    def observe(self, operation_time: Optional[Timestamp]) -> None:
+        """
+        Record the cluster time of a catalog write
+
+        Args:
+            operation_time: Operation or cluster time; None is ignored
+        """
+        if operation_time is not None and (self.operation_time is None or operation_time > self.operation_time):
+            self.operation_time = operation_time
+
+    def reset(self) -> None:
+        """Forget the recorded time (used when switching databases)"""
+        self.operation_time = None
+
+# Newest catalog write known to this worker process
+catalog_write_clock = CatalogWriteClock()
+
+def catalog_reads(collection: AsyncIOMotorCollection) -> AsyncIOMotorCollection:
+    """
+    Get a view of a catalog collection for anonymous storefront reads
+
+    Args:
+        collection: Products or categories collection
+
+    Returns:
+        AsyncIOMotorCollection: Same collection reading secondaryPreferred
+            with CATALOG_MAX_STALENESS_SECONDS
+    """
+    return collection.with_options(read_preference=CATALOG_READ_PREFERENCE)
+
+@asynccontextmanager
+async def catalog_read_session(database: AsyncIOMotorDatabase) -> AsyncIterator[AsyncIOMotorClientSession]:
+    """
+    Start a causally consistent session for catalog reads
+
+    Reads in the session never observe the catalog as it was before the
+    newest write recorded in catalog_write_clock.
+
+    Args:
+        database: Database holding the catalog collections
+
+    Yields:
+        AsyncIOMotorClientSession: Session to pass to catalog_reads() queries
+    """
+    async with await database.client.start_session(causal_consistency=True) as session:
+        if catalog_write_clock.operation_time is not None:
+            session.advance_operation_time(catalog_write_clock.operation_time)
+        yield session
@@ -0,0 +1,320 @@
+# Standard library imports
+import csv
+import io
+import json
+import logging
+import os
+from datetime import datetime
+from itertools import islice
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterable, Iterator, List, Tuple
+
+# Third-party imports
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import openpyxl
+except ImportError:  # openpyxl is only needed for .xlsx imports
+    openpyxl = None
+
+# Local imports
+from .models import ProductCreate
+from .database import advance_product_id_sequence, apply_available_count_changes, product_id_allocator
+from .cache import invalidate_products
+from .utils.slugs import slugify, product_slug
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Import Configuration
+IMPORT_BATCH_SIZE = 500            # Rows per insert_many
+IMPORT_MAX_REPORTED_ERRORS = 1000  # Keep the report bounded for badly broken files
+DUPLICATE_KEY_ERROR = 11000
+
+# Spreadsheet headers are matched case-insensitively; these map common
+# spellings (including the ones in list.xlsx) onto ProductCreate fields
+COLUMN_ALIASES = {
+    "categories": "category",
+    "flavor": "flavour",
+    "image": "images",
+    "tag": "tags",
+    "id": "product_id",
+    "product_number": "product_id"
+}
+REQUIRED_COLUMNS = {"name", "description", "price", "category", "theme", "flavour"}
+LIST_COLUMNS = ("tags", "images")
+
+def _normalize_header(header: Any) -> str:
+    """Map a spreadsheet header onto a product field name"""
+    name = str(header or "").strip().lower().replace(" ", "_")
+    return COLUMN_ALIASES.get(name, name)
+
+def _check_headers(headers: List[str]) -> None:
+    """Fail fast when a required column is missing, instead of on every row"""
+    missing = REQUIRED_COLUMNS - set(headers)
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+
+def _iter_csv_rows(stream: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """Read CSV rows one at a time"""
+    # utf-8-sig drops the BOM spreadsheet programs like to add; undecodable
+    # bytes are replaced so they fail validation of their own row only
+    reader = csv.reader(io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline=""))
+    headers = [_normalize_header(header) for header in next(reader, [])]
+    _check_headers(headers)
+    for values in reader:
+        yield dict(zip(headers, values))
+
+def _iter_xlsx_rows(stream: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """Read rows of the first worksheet one at a time"""
+    if openpyxl is None:
+        raise ValueError("XLSX imports require openpyxl, upload a CSV file instead")
+    # read_only streams rows instead of loading the whole workbook
+    try:
+        workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    except Exception as e:
+        # openpyxl raises zip and XML errors for files that aren't workbooks
+        raise ValueError(f"Could not read XLSX file: {str(e)}")
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [_normalize_header(header) for header in next(rows, ())]
+        _check_headers(headers)
+        for values in rows:
+            yield dict(zip(headers, values))
+    finally:
+        workbook.close()
+
+def iter_spreadsheet_rows(stream: BinaryIO, filename: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream rows from an uploaded CSV or XLSX file
+
+    Args:
+        stream: Binary file object
+        filename: Original file name, used to pick the format
+
+    Returns:
+        Iterator[dict]: Rows keyed by product field name
+
+    Raises:
+        ValueError: If the format is unsupported or required columns are missing
+    """
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension == ".csv":
+        return _iter_csv_rows(stream)
+    if extension == ".xlsx":
+        return _iter_xlsx_rows(stream)
+    raise ValueError("Unsupported file type, expected .csv or .xlsx")
+
+def _clean_row(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn raw cell values into ProductCreate input
+
+    Empty cells are dropped so model defaults apply, and list columns accept
+    either a JSON array or values separated by "|" or ",".
+    """
+    row = {}
+    for field, value in raw.items():
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == "" or not field:
+            continue
+        if field in LIST_COLUMNS and isinstance(value, str):
+            if value.startswith("["):
+                try:
+                    value = json.loads(value)
+                except json.JSONDecodeError:
+                    pass  # Reported by validation below
+            else:
+                separator = "|" if "|" in value else ","
+                value = [item.strip() for item in value.split(separator) if item.strip()]
+        row[field] = value
+    return row
+
+def _validation_messages(error: ValidationError) -> List[str]:
+    """Flatten a pydantic error into "field: message" strings"""
+    return [
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    ]
+
+async def _load_category_names(database: AsyncIOMotorDatabase) -> Dict[str, str]:
+    """Prefetch a case-insensitive name/slug -> category name map"""
+    docs = await database.categories.find({}, {"name": 1, "slug": 1}).to_list(length=None)
+    names: Dict[str, str] = {}
+    # Slugs first so an exact name always wins over another category's slug
+    for doc in docs:
+        if doc.get("slug"):
+            names[doc["slug"].casefold()] = doc["name"]
+    for doc in docs:
+        names[doc["name"].casefold()] = doc["name"]
+    return names
+
+async def _read_rows(rows: Iterable[Dict[str, Any]], chunk_size: int) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Pull rows in a worker thread, one chunk at a time
+
+    Parsing (openpyxl in particular) is blocking, so the event loop only
+    handles rows that have already been read.
+    """
+    iterator = iter(rows)
+    while True:
+        chunk = await run_in_threadpool(list, islice(iterator, chunk_size))
+        if not chunk:
+            return
+        for raw in chunk:
+            yield raw
+
+class _ImportReport:
+    """Accumulates the per-row outcome of an import"""
+
+    def __init__(self):
+        self.total_rows = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def fail(self, row: int, errors: List[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "errors": errors})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total_rows": self.total_rows,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda error: error["row"])
+        }
+
+async def _insert_batch(
+    database: AsyncIOMotorDatabase,
+    batch: List[Tuple[int, dict, bool]],
+    report: _ImportReport
+) -> List[dict]:
+    """
+    Assign product numbers and slugs, then insert one batch
+
+    Args:
+        database: Target database
+        batch: (row number, product document, needs product number) triples
+        report: Report receiving rows rejected by MongoDB
+
+    Returns:
+        List[dict]: Documents that were inserted
+    """
+    # Claim explicit product numbers before inserting them: numbers the
+    # sequence already handed out may sit in a block reserved by a worker
+    explicit = [product["product_id"] for _, product, needs_id in batch if not needs_id]
+    reserved_up_to = await advance_product_id_sequence(database, max(explicit)) if explicit else 0
+    accepted = []
+    for row_number, product, needs_id in batch:
+        if not needs_id and product["product_id"] <= reserved_up_to:
+            report.fail(row_number, [
+                f"product_id: {product['product_id']} is reserved by the product number sequence, "
+                "leave it empty to assign one"
+            ])
+            continue
+        accepted.append((row_number, product, needs_id))
+    batch = accepted
+
+    # One block reservation covers every row without its own product number
+    missing = sum(1 for _, _, needs_id in batch if needs_id)
+    new_ids = iter(await product_id_allocator.allocate(database, missing) if missing else [])
+    now = datetime.utcnow()
+    documents = []
+    for _, product, needs_id in batch:
+        if needs_id:
+            product["product_id"] = next(new_ids)
+        product["slug"] = slugify(product.get("slug") or "") or product_slug(product["name"], product["product_id"])
+        product["version"] = 1
+        product["created_at"] = now
+        product["updated_at"] = now
+        documents.append(product)
+
+    if not documents:
+        return []
+    failed_indexes = set()
+    try:
+        # Unordered so one bad row doesn't stop the rest of the batch
+        await database.products.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        for write_error in e.details.get("writeErrors", []):
+            failed_indexes.add(write_error["index"])
+            if write_error.get("code") == DUPLICATE_KEY_ERROR:
+                message = "Duplicate product_id or slug"
+            else:
+                message = write_error.get("errmsg", "Insert failed")
+            report.fail(batch[write_error["index"]][0], [message])
+
+    inserted = [document for index, document in enumerate(documents) if index not in failed_indexes]
+    report.inserted += len(inserted)
+    return inserted
+
+async def import_products(
+    database: AsyncIOMotorDatabase,
+    rows: Iterable[Dict[str, Any]],
+    batch_size: int = IMPORT_BATCH_SIZE
+) -> Dict[str, Any]:
+    """
+    Validate and insert products from spreadsheet rows
+
+    Rows are parsed in a worker thread, categories are resolved from a
+    single prefetch, product numbers are reserved one block per batch, and
+    each batch is written with one unordered insert_many. Invalid rows are skipped and reported, as are
+    explicit product numbers the sequence has already handed out.
+
+    Args:
+        database: Target database
+        rows: Rows keyed by product field name, e.g. from iter_spreadsheet_rows
+        batch_size: Rows per insert_many
+
+    Returns:
+        dict: Counts and per-row errors, shaped like ProductImportResponse
+    """
+    category_names = await _load_category_names(database)
+    report = _ImportReport()
+    batch: List[Tuple[int, dict, bool]] = []
+    categories = set()
+
+    async def flush() -> None:
+        inserted = await _insert_batch(database, batch, report)
+        if inserted:
+            await apply_available_count_changes(database, [(None, product) for product in inserted])
+            categories.update(product["category"] for product in inserted)
+        batch.clear()
+
+    row_number = 1  # Row 1 is the header
+    async for raw in _read_rows(rows, batch_size):
+        row_number += 1
+        row = _clean_row(raw)
+        if not row:
+            continue  # Blank spreadsheet rows
+        report.total_rows += 1
+
+        needs_id = "product_id" not in row
+        try:
+            # Validated with a placeholder number that is replaced on insert
+            product = ProductCreate.model_validate({"product_id": 0, **row})
+        except ValidationError as e:
+            report.fail(row_number, _validation_messages(e))
+            continue
+        category = category_names.get(product.category.casefold())
+        if category is None:
+            report.fail(row_number, [f"category: Category '{product.category}' not found"])
+            continue
+
+        document = product.model_dump()
+        document["category"] = category
+        batch.append((row_number, document, needs_id))
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+
+    if report.inserted:
+        # New products have no cached single-product reads, only listings
+        await invalidate_products(database, [], categories)
+    logger.info(f"Imported {report.inserted} of {report.total_rows} products")
+    return report.as_dict()
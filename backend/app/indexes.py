@@ -0,0 +1,168 @@
+# Standard library imports
+import asyncio
+import logging
+import os
+from typing import Dict, List
+
+# Third-party imports
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, TEXT, IndexModel
+
+# Local imports
+from .database import CATEGORY_COLLATION
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Index Configuration
+# What the application does with the registry when a worker starts:
+#   "verify" - build missing unique indexes, warn about the others (default)
+#   "create" - build missing indexes before serving (handy for development)
+#   "skip"   - don't touch indexes at all
+INDEX_STARTUP_MODE: str = os.getenv("INDEX_STARTUP_MODE", "verify")
+
+# Declarative index registry
+# Every index the application relies on, per collection. Indexes are
+# diffed against list_indexes() by name, which defaults to the one
+# create_index() generates. Build missing ones with
+# `python -m scripts.manage_indexes`.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True)
+    ],
+    "products": [
+        IndexModel([("name", ASCENDING)]),
+        # Unique lookups for /by-number and /by-slug; both are partial because
+        # legacy products may lack a product number, and products created
+        # before slugs existed don't have one yet
+        IndexModel(
+            [("product_id", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"product_id": {"$type": "number"}}
+        ),
+        IndexModel(
+            [("slug", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"slug": {"$type": "string"}}
+        ),
+        IndexModel([("category_id", ASCENDING)]),
+        # Text search index
+        IndexModel([("name", TEXT), ("description", TEXT)]),
+        # Compound indexes matching the (name, _id) listing sort so keyset
+        # pagination seeks straight to the next page for both listing shapes
+        IndexModel([("available", ASCENDING), ("name", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("category", ASCENDING), ("available", ASCENDING), ("name", ASCENDING), ("_id", ASCENDING)]),
+        # Filter indexes for the storefront sidebar (tags is multikey); they
+        # end in the full (name, _id) listing sort so no in-memory SORT is needed
+        IndexModel([("available", ASCENDING), ("theme", ASCENDING), ("name", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("available", ASCENDING), ("flavour", ASCENDING), ("name", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("available", ASCENDING), ("tags", ASCENDING), ("name", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("available", ASCENDING), ("price", ASCENDING)])
+    ],
+    "categories": [
+        IndexModel([("name", ASCENDING)], unique=True),
+        # Case-insensitive twin of the name index, used by category resolution
+        IndexModel([("name", ASCENDING)], name="name_ci", collation=CATEGORY_COLLATION)
+    ]
+}
+
+async def _existing_index_names(database: AsyncIOMotorDatabase, collection: str) -> List[str]:
+    """List the index names of one collection (empty if it doesn't exist yet)"""
+    return [index["name"] async for index in database[collection].list_indexes()]
+
+async def diff_indexes(database: AsyncIOMotorDatabase) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Compare the registry with the indexes that exist
+
+    All collections are listed concurrently, one round trip each.
+
+    Args:
+        database: Database to inspect
+
+    Returns:
+        dict: Per collection, "missing" declared index names and "extra"
+            existing ones the registry doesn't know about
+    """
+    collections = list(INDEXES)
+    existing = await asyncio.gather(*(_existing_index_names(database, name) for name in collections))
+    diff = {}
+    for collection, names in zip(collections, existing):
+        declared = [model.document["name"] for model in INDEXES[collection]]
+        diff[collection] = {
+            "missing": [name for name in declared if name not in names],
+            "extra": [name for name in names if name != "_id_" and name not in declared]
+        }
+    return diff
+
+async def _create_missing(database: AsyncIOMotorDatabase, collection: str, names: List[str]) -> List[str]:
+    """Build the given registry indexes of one collection in one command"""
+    models = [model for model in INDEXES[collection] if model.document["name"] in names]
+    # createIndexes builds all of them in a single scan of the collection
+    return await database[collection].create_indexes(models)
+
+async def ensure_indexes(database: AsyncIOMotorDatabase) -> Dict[str, List[str]]:
+    """
+    Build the registry indexes that don't exist yet
+
+    Existing indexes are left alone. Missing ones are built with one
+    createIndexes command per collection, collections concurrently.
+
+    Args:
+        database: Database to create the indexes in
+
+    Returns:
+        dict: Names of the indexes created, per collection
+    """
+    diff = await diff_indexes(database)
+    pending = {collection: entry["missing"] for collection, entry in diff.items() if entry["missing"]}
+    if not pending:
+        return {}
+    logger.info(f"Building missing indexes: {pending}")
+    created = await asyncio.gather(*(
+        _create_missing(database, collection, names) for collection, names in pending.items()
+    ))
+    return dict(zip(pending, created))
+
+def _is_unique(collection: str, name: str) -> bool:
+    """Whether a registry index enforces uniqueness"""
+    return any(
+        model.document["name"] == name and model.document.get("unique")
+        for model in INDEXES[collection]
+    )
+
+async def check_indexes_on_startup(database: AsyncIOMotorDatabase, mode: str = INDEX_STARTUP_MODE) -> None:
+    """
+    Apply INDEX_STARTUP_MODE when a worker starts
+
+    Unique indexes are what keeps emails, product numbers and slugs from
+    colliding, so "verify" builds the missing ones before serving; if a
+    build fails (e.g. on duplicates) the worker doesn't start.
+
+    Args:
+        database: Application database
+        mode: "verify", "create" or "skip"
+    """
+    if mode == "skip":
+        return
+    if mode == "create":
+        await ensure_indexes(database)
+        return
+    diff = await diff_indexes(database)
+    unique = {
+        collection: [name for name in entry["missing"] if _is_unique(collection, name)]
+        for collection, entry in diff.items()
+    }
+    unique = {collection: names for collection, names in unique.items() if names}
+    if unique:
+        logger.info(f"Building missing unique indexes: {unique}")
+        await asyncio.gather(*(
+            _create_missing(database, collection, names) for collection, names in unique.items()
+        ))
+    missing = {
+        collection: [name for name in entry["missing"] if name not in unique.get(collection, [])]
+        for collection, entry in diff.items()
+    }
+    missing = {collection: names for collection, names in missing.items() if names}
+    if missing:
+        # Queries still work, just slower; don't block startup on a build
+        logger.warning(f"Missing indexes {missing}, run `python -m scripts.manage_indexes` to build them")
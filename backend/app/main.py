@@ -1,14 +1,57 @@
 # Standard library imports
 import os
-from typing import Dict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
 
 # Third-party imports
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 # Local imports
-from .database import init_db, db, users, products, categories
+from .database import connect_db, close_db, pool_stats
+from .cache import catalog_cache, catalog_version
+from .snapshot import catalog_snapshot
+from .compression import CompressionMiddleware, compression_stats
+from .watcher import catalog_watcher
+from .indexes import check_indexes_on_startup
+from .metrics import METRICS_CONTENT_TYPE, MetricsMiddleware, render_metrics, snapshot_metrics
+from .slow_queries import slow_query_recorder
+
+# Application Lifespan
+# Runs once per uvicorn worker, so every worker gets its own MongoDB client
+# created inside its own event loop.
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Connect to MongoDB and warm caches on startup, clean up on shutdown"""
+    database = await connect_db()
+    # Add database and collections to app state
+    app.mongodb = database
+    app.users = database.users
+    app.products = database.products
+    app.categories = database.categories
+    # Explain slow query shapes in the background of this worker's loop
+    slow_query_recorder.start(database)
+
+    # Indexes are built by scripts/manage_indexes.py; by default this only
+    # lists them, so a cold worker doesn't wait on index builds
+    await check_indexes_on_startup(database)
+    # Follow writes made by other workers so our caches never go stale
+    catalog_watcher.start(database)
+    # Load the shared catalog version used for ETags
+    await catalog_version.refresh(database, force=True)
+    # Warm the catalog cache so the first visitors don't pay for cold reads
+    await warm_category_cache(app)
+    await warm_product_cache(app)
+    await catalog_snapshot.ensure_fresh(database)
+    try:
+        yield
+    finally:
+        # Stop background tasks before the client they use goes away
+        await catalog_watcher.stop()
+        await slow_query_recorder.stop()
+        close_db()
 
 # Initialize FastAPI application
 app = FastAPI(
@@ -16,15 +59,10 @@ app = FastAPI(
     description="Backend API for Laxmi Bakery Website",
     version="1.0.0",
     docs_url="/docs",  # Swagger UI endpoint
-    redoc_url="/redoc"  # ReDoc endpoint
+    redoc_url="/redoc",  # ReDoc endpoint
+    lifespan=lifespan
 )
 
-# Add database and collections to app state
-app.mongodb = db
-app.users = users
-app.products = products
-app.categories = categories
-
 # CORS Configuration
 # Allow cross-origin requests for web client
 app.add_middleware(
@@ -35,6 +73,14 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# Response Compression
+# Negotiated gzip/brotli for larger API responses
+app.add_middleware(CompressionMiddleware)
+
+# Request Metrics
+# Added last so it is the outermost middleware and times compression too
+app.add_middleware(MetricsMiddleware)
+
 # File Storage Configuration
 # Create uploads directory if it doesn't exist
 UPLOAD_DIR = "uploads"
@@ -48,10 +94,14 @@ app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
 api_router = APIRouter(prefix="/api")
 
 # Include routers with their specific prefixes
-from .routes import auth, products, categories
+from .routes import auth, products, categories, catalog, admin
+from .routes.products import warm_product_cache
+from .routes.categories import warm_category_cache
 api_router.include_router(auth.router, prefix="/auth")
 api_router.include_router(products.router, prefix="/products")  # This will handle /api/products/*
 api_router.include_router(categories.router, prefix="/categories")
+api_router.include_router(catalog.router, prefix="/catalog")
+api_router.include_router(admin.router, prefix="/admin")
 
 # Include the API router in the main app
 app.include_router(api_router)
@@ -70,11 +120,58 @@ async def health_check() -> Dict[str, str]:
         "version": "1.0.0"
     }
 
-# Startup Event Handler
-@app.on_event("startup")
-async def startup_event():
-    """Initialize application on startup"""
-    await init_db()
+# Cache Statistics Endpoint
+@app.get("/cache/stats", tags=["System"])
+async def cache_stats() -> Dict[str, Any]:
+    """
+    Catalog cache counters
+    
+    Returns:
+        dict: Entry count, hits, misses, evictions, hit ratio and the
+            state of the cross-worker invalidation watcher
+    """
+    return {**catalog_cache.stats(), "watcher": catalog_watcher.stats()}
+
+# Compression Statistics Endpoint
+@app.get("/compression/stats", tags=["System"])
+async def compression_statistics() -> Dict[str, Any]:
+    """
+    Response compression counters
+    
+    Returns:
+        dict: Bytes in/out, compression ratio, CPU time and memo hit ratio
+    """
+    return compression_stats.snapshot()
+
+# Database Statistics Endpoint
+@app.get("/database/stats", tags=["System"])
+async def database_statistics() -> Dict[str, Any]:
+    """
+    MongoDB connection pool counters of this worker
+    
+    Returns:
+        dict: Open and in-use connections, checkouts, failures and the
+            time requests waited for a pooled connection
+    """
+    return pool_stats.snapshot()
+
+# Prometheus Metrics Endpoint
+@app.get("/metrics", tags=["System"], include_in_schema=False)
+async def metrics() -> Response:
+    """
+    Metrics of this worker in the Prometheus text format
+    
+    Request latency by route and status, in-flight requests, MongoDB
+    command latency by collection and command, uploaded bytes, plus the
+    pool, cache and compression counters served by the stats endpoints.
+    """
+    body = render_metrics(
+        snapshot_metrics("mongodb_pool", pool_stats.snapshot()),
+        snapshot_metrics("catalog_cache", catalog_cache.stats()),
+        snapshot_metrics("catalog_watcher", catalog_watcher.stats()),
+        snapshot_metrics("compression", compression_stats.snapshot())
+    )
+    return Response(body, media_type=METRICS_CONTENT_TYPE)
 
 # Main entry point
 if __name__ == "__main__":
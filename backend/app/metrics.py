@@ -0,0 +1,249 @@
+# Standard library imports
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Third-party imports
+from pymongo import monitoring
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Metrics Configuration
+# Prometheus text exposition format; every worker process exposes its own values
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRICS_PREFIX = "laxmi"
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_COMMAND_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+def _escape(value: str) -> str:
+    """Escape a label value for the exposition format"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Render a {name="value",...} label set"""
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    """Render a sample value (integers without a trailing .0)"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    """Monotonic counter, without labels"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = f"{METRICS_PREFIX}_{name}"
+        self.help_text = help_text
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        # Only changed from the event loop thread, so no lock is needed
+        self.value += amount
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} counter",
+            f"{self.name} {_number(self.value)}"
+        ]
+
+class Gauge:
+    """Value that goes up and down, without labels (event loop thread only)"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = f"{METRICS_PREFIX}_{name}"
+        self.help_text = help_text
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {_number(self.value)}"
+        ]
+
+class Histogram:
+    """
+    Fixed-bucket histogram with labels
+
+    Observations only bump one bucket; cumulative counts are computed
+    when rendering, so observing stays O(log buckets).
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], buckets: Sequence[float]):
+        self.name = f"{METRICS_PREFIX}_{name}"
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket_labels = _labels(self.label_names, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_set = _labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_set} {repr(total)}")
+            lines.append(f"{self.name}_count{label_set} {cumulative}")
+        return lines
+
+# Application metrics
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+    REQUEST_BUCKETS
+)
+requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+mongo_command_duration = Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command latency by collection and command",
+    ("collection", "command", "outcome"),
+    MONGO_COMMAND_BUCKETS
+)
+upload_bytes = Counter("upload_bytes_total", "Bytes of uploaded files saved to disk")
+
+def snapshot_metrics(name: str, values: Dict[str, Any]) -> List[str]:
+    """
+    Expose the numeric values of a stats snapshot (e.g. cache stats)
+
+    Args:
+        name: Metric name prefix, e.g. "catalog_cache"
+        values: Snapshot dict; non-numeric values are skipped
+
+    Returns:
+        List[str]: Exposition lines, one untyped metric per value
+    """
+    lines = []
+    for key, value in values.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        metric = f"{METRICS_PREFIX}_{name}_{key}"
+        lines.append(f"# TYPE {metric} untyped")
+        lines.append(f"{metric} {_number(value)}")
+    return lines
+
+def render_metrics(*extra: List[str]) -> str:
+    """
+    Render every application metric in the Prometheus text format
+
+    Args:
+        extra: Additional exposition lines, e.g. from snapshot_metrics()
+
+    Returns:
+        str: Exposition body
+    """
+    lines: List[str] = []
+    for metric in (request_duration, requests_in_flight, mongo_command_duration, upload_bytes):
+        lines.extend(metric.render())
+    for block in extra:
+        lines.extend(block)
+    return "\n".join(lines) + "\n"
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Times every MongoDB command by collection and command name
+
+    The duration comes from the driver's own succeeded/failed events;
+    only the collection name has to be remembered from the started event.
+    """
+
+    def __init__(self):
+        # (request id, connection) -> (collection, command name)
+        self._pending: Dict[Tuple[int, Any], Tuple[str, str]] = {}
+
+    def started(self, event) -> None:
+        command = event.command
+        target = command.get(event.command_name)
+        # getMore names the cursor id first and the collection separately
+        collection = target if isinstance(target, str) else command.get("collection", "")
+        self._pending[(event.request_id, event.connection_id)] = (
+            collection if isinstance(collection, str) else "",
+            event.command_name
+        )
+
+    def succeeded(self, event) -> None:
+        self._finish(event, "success")
+
+    def failed(self, event) -> None:
+        self._finish(event, "failure")
+
+    def _finish(self, event, outcome: str) -> None:
+        collection, command = self._pending.pop(
+            (event.request_id, event.connection_id),
+            ("", event.command_name)
+        )
+        mongo_command_duration.observe(event.duration_micros / 1_000_000, collection, command, outcome)
+
+def _route_template(scope: Scope) -> str:
+    """Route template of a handled request, keeping label cardinality bounded"""
+    route = scope.get("route")
+    if route is not None:
+        return route.path  # e.g. /api/products/{product_id}
+    # Mounted apps (uploads) only record their mount path
+    return scope.get("root_path") or "unmatched"
+
+class MetricsMiddleware:
+    """
+    Records latency and in-flight requests of every HTTP request
+
+    Must be the outermost middleware so the time includes compression.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code: Optional[int] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            requests_in_flight.dec()
+            # The router stores the matched route in the shared scope
+            request_duration.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                _route_template(scope),
+                str(status_code or 500)
+            )
+
+# Command listener registered on the MongoDB client
+mongo_command_metrics = MongoCommandMetrics()
@@ -41,8 +41,10 @@ class ProductBase(BaseModel):
         discount (float): Percentage discount on the product (default: 0)
         tags (List[str]): List of tags associated with the product
         images (List[str]): List of image URLs for the product
+        slug (Optional[str]): URL slug, generated from the name when omitted
     """
     product_id: int
+    slug: Optional[str] = None  # Unique, used for /api/products/by-slug/{slug}
     name: str
     description: str
     price: float
@@ -77,8 +79,10 @@ class ProductUpdate(BaseModel):
         discount (Optional[float]): Updated discount percentage
         tags (Optional[List[str]]): Updated list of tags
         images (Optional[List[str]]): Updated list of image URLs
+        slug (Optional[str]): Updated URL slug
     """
     product_id: Optional[int] = None
+    slug: Optional[str] = None
     name: Optional[str] = None
     description: Optional[str] = None
     price: Optional[float] = None
@@ -123,8 +127,10 @@ class ProductResponse(ProductBase):
     
     Attributes:
         _id (str): The unique identifier for the product
+        version (int): Incremented on every write, for optimistic concurrency
     """
     _id: str
+    version: int = 0  # Documents written before versioning count as version 0
 
     class Config:
         """Pydantic model configuration.
@@ -141,6 +147,107 @@ class ProductListResponse(BaseModel):
     """Model for paginated product list response"""
     items: List[ProductResponse]
     pagination: dict
+    facets: Optional[dict] = None  # Only filled when facets are requested
+
+class ProductPartialResponse(BaseModel):
+    """Model for products read with a sparse fieldset.
+    
+    Every field is optional because only the requested fields are
+    fetched from MongoDB; fields that weren't requested are left out
+    of the response entirely.
+    """
+    product_id: Optional[int] = None
+    slug: Optional[str] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    price: Optional[float] = None
+    category: Optional[str] = None
+    available: Optional[bool] = None
+    discount: Optional[float] = None
+    tags: Optional[List[str]] = None
+    images: Optional[List[str]] = None
+    theme: Optional[str] = None
+    flavour: Optional[str] = None
+    version: Optional[int] = None
+
+class ProductPartialListResponse(BaseModel):
+    """Model for paginated product lists read with a sparse fieldset"""
+    items: List[ProductPartialResponse]
+    pagination: dict
+    facets: Optional[dict] = None
+
+class ProductBatchItem(BaseModel):
+    """Result for one requested id of a batch product fetch"""
+    id: str  # The id exactly as requested
+    found: bool
+    product: Optional[ProductResponse] = None
+    error: Optional[str] = None  # "not_found" or "invalid_id" when found is False
+
+class ProductBatchResponse(BaseModel):
+    """Model for batch product fetch results, in request order"""
+    items: List[ProductBatchItem]
+
+class ProductSearchResult(ProductResponse):
+    """Product returned by full-text search with its relevance score"""
+    score: float
+
+class ProductSearchResponse(BaseModel):
+    """Model for paginated, relevance-ranked search results"""
+    items: List[ProductSearchResult]
+    pagination: dict
+
+class ProductBulkChanges(BaseModel):
+    """Fields a bulk update may change; omitted fields are left as they are"""
+    price: Optional[float] = Field(default=None, gt=0)
+    discount: Optional[float] = Field(default=None, ge=0, le=100)
+    available: Optional[bool] = None
+
+class ProductBulkUpdateItem(BaseModel):
+    """Changes for one product, addressed by ObjectId or product number"""
+    id: str
+    update: ProductBulkChanges
+
+class ProductBulkFilter(BaseModel):
+    """Products matched by a filter+update bulk edit; all conditions must hold"""
+    category: Optional[str] = None  # Category name or slug
+    available: Optional[bool] = None
+    theme: Optional[str] = None
+    flavour: Optional[str] = None
+    tags: Optional[List[str]] = None  # Products having any of these tags
+
+class ProductBulkUpdateRequest(BaseModel):
+    """Either a list of per-product updates or one update applied to a filter.
+    
+    Example (10% off every cupcake):
+        {"filter": {"category": "cup-cakes"}, "update": {"discount": 10}}
+    """
+    items: Optional[List[ProductBulkUpdateItem]] = None
+    filter: Optional[ProductBulkFilter] = None
+    update: Optional[ProductBulkChanges] = None
+
+class ProductBulkUpdateResult(BaseModel):
+    """Outcome for one product of a bulk update"""
+    id: str  # The id as requested, or the ObjectId for filter updates
+    product_id: Optional[int] = None
+    status: str  # "updated", "not_found" or "invalid_id"
+
+class ProductBulkUpdateResponse(BaseModel):
+    """Summary of a bulk update"""
+    matched: int
+    modified: int
+    items: List[ProductBulkUpdateResult]
+
+class ProductImportRowError(BaseModel):
+    """Problems found in one spreadsheet row of a bulk import"""
+    row: int  # Spreadsheet row number, the header being row 1
+    errors: List[str]
+
+class ProductImportResponse(BaseModel):
+    """Summary of a bulk product import"""
+    total_rows: int
+    inserted: int
+    failed: int
+    errors: List[ProductImportRowError]
 
 # Category Models
 class CategoryBase(BaseModel):
@@ -164,6 +271,9 @@ class CategoryUpdate(BaseModel):
 class CategoryResponse(CategoryBase):
     """Model for category response data"""
     id: str = Field(alias="_id")
+    version: int = 0  # Incremented on every write, for optimistic concurrency
+    product_count: int = 0  # Maintained by the product write paths
+    available_count: int = 0  # Products currently shown in the storefront
 
     class Config:
         json_schema_extra = {
@@ -189,11 +299,12 @@ class TokenData(BaseModel):
 
 class PaginationMetadata(BaseModel):
     """Pagination metadata model"""
-    page: int
+    page: Optional[int] = None  # None when paging with a cursor
     limit: int
-    total_items: int
-    total_pages: int
+    total_items: Optional[int] = None  # None when include_total=false
+    total_pages: Optional[int] = None
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
 
 # ... rest of the existing code ... 
\ No newline at end of file
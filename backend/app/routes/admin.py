@@ -0,0 +1,43 @@
+# Standard library imports
+from typing import Any, Dict
+
+# Third-party imports
+from fastapi import APIRouter, Depends, Query
+
+# Local imports
+from ..auth import get_current_admin
+from ..slow_queries import slow_query_recorder
+
+# Create router instance
+router = APIRouter(
+    tags=["Admin"],
+    responses={401: {"description": "Unauthorized - Admin access required"}}
+)
+
+@router.get("/slow-queries")
+async def list_slow_queries(
+    limit: int = Query(50, ge=1, le=1000, description="Number of entries, newest first"),
+    current_admin: dict = Depends(get_current_admin)
+) -> Dict[str, Any]:
+    """
+    List recent slow MongoDB queries of this worker (Admin only)
+    
+    Every command slower than SLOW_QUERY_THRESHOLD_MS is recorded with its
+    normalized shape (literal values replaced by "?"). Slow shapes are
+    explained in the background, so "plan" fills in shortly after a shape
+    first shows up. Queries scanning the whole collection (COLLSCAN),
+    sorting in memory or using skip are flagged in "warnings".
+    
+    Args:
+        limit: Maximum number of entries
+        current_admin: Current admin user (injected by dependency)
+    
+    Returns:
+        dict: Threshold, number of flagged entries and the entries
+    """
+    items = slow_query_recorder.recent(limit)
+    return {
+        "threshold_ms": slow_query_recorder.threshold_ms,
+        "flagged": sum(1 for item in items if item["warnings"]),
+        "items": items
+    }
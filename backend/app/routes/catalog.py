@@ -0,0 +1,52 @@
+# Third-party imports
+from fastapi import APIRouter, Request, Response, status
+
+# Local imports
+from ..cache import catalog_version
+from ..snapshot import catalog_snapshot
+from ..utils.conditional import CATALOG_CACHE_CONTROL, etag_matches
+from ..utils.encoding import choose_encoding, variant_etag
+
+# Create router instance
+router = APIRouter(tags=["Catalog"])
+
+@router.get("/snapshot")
+async def get_catalog_snapshot(request: Request) -> Response:
+    """
+    Get every available product grouped by category
+
+    The body is rendered and compressed ahead of time whenever the
+    catalog changes, so serving it is a memory copy. The best encoding
+    the client accepts (br, gzip or none) is picked from Accept-Encoding.
+
+    Args:
+        request: FastAPI request object
+
+    Returns:
+        Response: Pre-encoded JSON snapshot, or 304 if the client's copy
+            is current
+    """
+    # Pick up writes made by other workers before deciding freshness
+    await catalog_version.refresh(request.app.mongodb)
+    await catalog_snapshot.ensure_fresh(request.app.mongodb)
+
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    etag = variant_etag(catalog_snapshot.etag(), encoding)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": CATALOG_CACHE_CONTROL,
+        "Vary": "Accept-Encoding"
+    }
+    # The compression middleware strips -br/-gzip suffixes from
+    # If-None-Match, so the plain snapshot ETag counts as a match too
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(if_none_match, etag) or etag_matches(if_none_match, catalog_snapshot.etag()):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=catalog_snapshot.variants[encoding or "identity"],
+        media_type="application/json",
+        headers=headers
+    )
@@ -1,15 +1,23 @@
 # Standard library imports
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 # Third-party imports
-from fastapi import APIRouter, Depends, HTTPException, status, Request, File, UploadFile, Form
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, status, Request, Response, File, UploadFile, Form
 from bson import ObjectId
+from bson.errors import InvalidId
+from motor.motor_asyncio import AsyncIOMotorClientSession
+from pymongo import ReturnDocument
 
 # Local imports
 from ..models import CategoryCreate, CategoryUpdate, CategoryResponse
 from ..auth import get_current_admin
-from ..utils.file_handler import is_valid_image, save_upload_file
+from ..database import catalog_reads, catalog_read_session
+from ..cache import catalog_cache, invalidate_categories, TAG_CATEGORIES
+from ..utils.file_handler import is_valid_image, save_upload_file, delete_file
+from ..utils.conditional import check_catalog_etag, version_filter, raise_write_conflict
+from ..utils.serialization import FAST_LIST_RESPONSES, FastJSONResponse
+from ..utils.sessions import get_admin_session
 
 # Create router instance
 router = APIRouter(
@@ -24,7 +32,8 @@ async def create_category(
     description: str = Form(...),
     slug: str = Form(...),
     image: UploadFile = File(None),
-    current_admin: dict = Depends(get_current_admin)
+    current_admin: dict = Depends(get_current_admin),
+    session: AsyncIOMotorClientSession = Depends(get_admin_session)
 ) -> dict:
     """
     Create a new category (Admin only)
@@ -33,6 +42,7 @@ async def create_category(
         request: FastAPI request object
         category_data: Category creation data
         current_admin: Current admin user (injected by dependency)
+        session: Causal admin session (injected by dependency)
     
     Returns:
         dict: Created category information
@@ -41,7 +51,7 @@ async def create_category(
         HTTPException: If category with same name exists
     """
     # Check if category name already exists
-    if await request.app.categories.find_one({"name": name}):
+    if await request.app.categories.find_one({"name": name}, session=session):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Category with this name already exists"
@@ -59,22 +69,41 @@ async def create_category(
         "name": name,
         "description": description,
         "slug": slug,
-        "images": images
+        "images": images,
+        "version": 1,
+        "product_count": 0,
+        "available_count": 0
     }
     # Insert into database
-    result = await request.app.categories.insert_one(category)
+    result = await request.app.categories.insert_one(category, session=session)
     category["_id"] = str(result.inserted_id)
+    
+    # Drop the cached category list and any listing filtered on this name
+    await invalidate_categories(request.app.mongodb, [name], session=session)
     return category
 
-@router.get("", response_model=dict)
-async def list_categories(request: Request) -> dict:
+async def get_category_list(app: FastAPI) -> dict:
     """
-    List all categories with total count
+    Get all categories through the catalog cache
+    
+    Args:
+        app: FastAPI application holding the collections
+    
+    Returns:
+        dict: Validated categories and their total count
     """
-    cursor = request.app.categories.find().sort("name", 1)
-    category_list = await cursor.to_list(length=None)
+    key = ("categories:list",)
+    cached = catalog_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    # Remember the generation so a write racing this load isn't cached over
+    generation = catalog_cache.generation
+    async with catalog_read_session(app.mongodb) as session:
+        # Anonymous catalog reads may be served by a secondary
+        cursor = catalog_reads(app.categories).find(session=session).sort("name", 1)
+        category_list = await cursor.to_list(length=None)
     # Convert ObjectId to string and validate with CategoryResponse
-    from ..models import CategoryResponse
     items = []
     for category in category_list:
         category["_id"] = str(category["_id"])
@@ -83,7 +112,39 @@ async def list_categories(request: Request) -> dict:
             items.append(CategoryResponse(**category))
         except Exception as e:
             print(f"Skipping invalid category: {category.get('_id', '')}, error: {e}")
-    return {"items": [item.model_dump(by_alias=True) for item in items], "total": len(items)}
+    result = {"items": [item.model_dump(by_alias=True) for item in items], "total": len(items)}
+    catalog_cache.set(key, result, [TAG_CATEGORIES], generation=generation)
+    return result
+
+async def warm_category_cache(app: FastAPI) -> None:
+    """
+    Preload the category list
+    
+    Args:
+        app: FastAPI application holding the collections
+    """
+    await get_category_list(app)
+
+@router.get("", response_model=dict)
+async def list_categories(request: Request, response: Response) -> dict:
+    """
+    List all categories with total count
+    
+    Each category carries its maintained product_count/available_count,
+    so the menu renders from this one cached query.
+    
+    Responses carry an ETag derived from the catalog version, and
+    If-None-Match requests for the current version get 304.
+    """
+    # Answer conditional requests without touching the database
+    not_modified = await check_catalog_etag(request, response)
+    if not_modified:
+        return not_modified
+    result = await get_category_list(request.app)
+    if FAST_LIST_RESPONSES:
+        # Categories were validated when the list was built, encode directly
+        return FastJSONResponse(result, headers=dict(response.headers))
+    return result
 
 @router.get("/{category_id}", response_model=CategoryResponse)
 async def get_category(request: Request, category_id: str) -> dict:
@@ -101,7 +162,8 @@ async def get_category(request: Request, category_id: str) -> dict:
         HTTPException: If category not found
     """
     try:
-        category = await request.app.categories.find_one({"_id": ObjectId(category_id)})
+        async with catalog_read_session(request.app.mongodb) as session:
+            category = await catalog_reads(request.app.categories).find_one({"_id": ObjectId(category_id)}, session=session)
         if not category:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -126,29 +188,41 @@ async def update_category(
     description: str = Form(None),
     slug: str = Form(None),
     image: UploadFile = File(None),
-    current_admin: dict = Depends(get_current_admin)
+    version: Optional[int] = Form(None),
+    current_admin: dict = Depends(get_current_admin),
+    session: AsyncIOMotorClientSession = Depends(get_admin_session)
 ) -> dict:
     """
     Update a category (Admin only)
     
+    The category is changed with a single atomic find_one_and_update, so
+    concurrent image uploads are all kept.
+    
     Args:
         request: FastAPI request object
         category_id: Category ID
-        update_data: Category update data
+        name: Updated category name
+        description: Updated description
+        slug: Updated slug
+        image: New image, appended to the category's images
+        version: Version the client last read; the update is rejected if
+            the category changed since
         current_admin: Current admin user (injected by dependency)
+        session: Causal admin session (injected by dependency)
     
     Returns:
         dict: Updated category information
     
     Raises:
-        HTTPException: If category not found or update invalid
+        HTTPException: If category not found, modified since `version`
+            (409) or update invalid
     """
-    # Check if category exists
-    category = await request.app.categories.find_one({"_id": ObjectId(category_id)})
-    if not category:
+    try:
+        object_id = ObjectId(category_id)
+    except InvalidId:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Category not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid category ID format"
         )
     update_data = {}
     if name is not None:
@@ -157,14 +231,7 @@ async def update_category(
         update_data["description"] = description
     if slug is not None:
         update_data["slug"] = slug
-    if image:
-        if not is_valid_image(image):
-            raise HTTPException(status_code=400, detail="Invalid image format")
-        image_url = await save_upload_file(image)
-        if not image_url:
-            raise HTTPException(status_code=500, detail="Error saving image")
-        update_data["images"] = category.get("images", []) + [image_url]
-    if not update_data:
+    if not update_data and not image:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No fields to update"
@@ -173,32 +240,59 @@ async def update_category(
     if "name" in update_data:
         existing = await request.app.categories.find_one({
             "name": update_data["name"],
-            "_id": {"$ne": ObjectId(category_id)}
-        })
+            "_id": {"$ne": object_id}
+        }, session=session)
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Category with this name already exists"
             )
-    # Update in database
-    result = await request.app.categories.update_one(
-        {"_id": ObjectId(category_id)},
-        {"$set": update_data}
+    image_url = None
+    if image:
+        if not is_valid_image(image):
+            raise HTTPException(status_code=400, detail="Invalid image format")
+        image_url = await save_upload_file(image)
+        if not image_url:
+            raise HTTPException(status_code=500, detail="Error saving image")
+    
+    update = {"$inc": {"version": 1}}
+    if update_data:
+        update["$set"] = update_data
+    if image_url:
+        # Appended server side, so concurrent uploads can't drop each other
+        update["$push"] = {"images": image_url}
+    
+    # One atomic round trip; the pre-image gives the old name to invalidate
+    category = await request.app.categories.find_one_and_update(
+        {"_id": object_id, **version_filter(version)},
+        update,
+        return_document=ReturnDocument.BEFORE,
+        session=session
+    )
+    if category is None:
+        if image_url:
+            await delete_file(image_url)
+        await raise_write_conflict(request.app.categories, object_id, version, "Category")
+    
+    updated_category = {**category, **update_data, "version": category.get("version", 0) + 1}
+    if image_url:
+        updated_category["images"] = category.get("images", []) + [image_url]
+    updated_category["_id"] = str(category["_id"])
+    
+    # Drop cached reads for both the old and new category name
+    await invalidate_categories(
+        request.app.mongodb,
+        [category.get("name"), updated_category.get("name")],
+        session=session
     )
-    if result.modified_count == 0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Category not updated"
-        )
-    updated_category = await request.app.categories.find_one({"_id": ObjectId(category_id)})
-    updated_category["_id"] = str(updated_category["_id"])
     return updated_category
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_category(
     request: Request,
     category_id: str,
-    current_admin: dict = Depends(get_current_admin)
+    current_admin: dict = Depends(get_current_admin),
+    session: AsyncIOMotorClientSession = Depends(get_admin_session)
 ) -> None:
     """
     Delete a category (Admin only)
@@ -207,22 +301,40 @@ async def delete_category(
         request: FastAPI request object
         category_id: Category ID
         current_admin: Current admin user (injected by dependency)
+        session: Causal admin session (injected by dependency)
     
     Raises:
         HTTPException: If category not found or has products
     """
-    # Check if category has products
-    product_count = await request.app.products.count_documents({"category": category_id})  # Changed from category_id to category
-    if product_count > 0:
+    try:
+        object_id = ObjectId(category_id)
+    except InvalidId:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid category ID format"
+        )
+    category = await request.app.categories.find_one({"_id": object_id}, {"name": 1}, session=session)
+    if category is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found"
+        )
+    
+    # Check if category has products; products reference categories by name.
+    # An exact existence check rather than the maintained count, which may lag
+    if await request.app.products.find_one({"category": category["name"]}, {"_id": 1}, session=session):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete category with existing products"
         )
     
     # Delete category
-    result = await request.app.categories.delete_one({"_id": ObjectId(category_id)})
+    result = await request.app.categories.delete_one({"_id": object_id}, session=session)
     if result.deleted_count == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found"
-        ) 
\ No newline at end of file
+        )
+    
+    # Drop cached reads that still include the deleted category
+    await invalidate_categories(request.app.mongodb, [category.get("name")], session=session)
\ No newline at end of file
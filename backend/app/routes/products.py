@@ -1,18 +1,61 @@
 # Standard library imports
-from typing import List, Optional
+import csv
+import io
+import json
+from typing import AsyncIterator, List, Optional
 from datetime import datetime
 
 # Third-party imports
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form, Request, Query
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, status, File, UploadFile, Form, Request, Response, Query, Path
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from bson import ObjectId
 from bson.errors import InvalidId
+from motor.motor_asyncio import AsyncIOMotorClientSession
+from pymongo import ReturnDocument, UpdateMany, UpdateOne
+from pymongo.errors import DuplicateKeyError
 
 # Local imports
-from ..models import ProductCreate, ProductUpdate, ProductResponse, ProductListResponse
-from ..database import products, categories
-from ..database import get_next_product_id
+from ..models import (
+    ProductCreate, ProductUpdate, ProductResponse, ProductListResponse, ProductSearchResponse,
+    ProductPartialResponse, ProductPartialListResponse, ProductBatchResponse, ProductImportResponse,
+    ProductBulkUpdateRequest, ProductBulkUpdateResponse, ProductBulkFilter
+)
+from ..database import get_next_product_id, get_available_product_count, adjust_available_product_counts
+from ..database import apply_available_count_changes, catalog_reads, catalog_read_session
 from ..auth import get_current_admin
 from ..utils.file_handler import is_valid_image, save_upload_file, delete_file
+from ..cache import catalog_cache, category_resolver, invalidate_products, category_tag, product_tag, TAG_ALL_PRODUCTS
+from ..utils.conditional import check_catalog_etag, version_filter, raise_write_conflict
+from ..utils.sessions import get_admin_session
+from ..utils.serialization import FAST_LIST_RESPONSES, FastJSONResponse, fast_product_list, dumps
+from ..utils.pagination import PRODUCT_SORT, encode_cursor, decode_cursor, keyset_filter
+from ..utils.slugs import slugify, product_slug
+from ..importer import IMPORT_BATCH_SIZE, import_products as run_product_import, iter_spreadsheet_rows
+
+# Facet Configuration
+PRICE_BUCKET_BOUNDARIES = [0, 250, 500, 1000, 2000, 5000]  # Price facet ranges in NRs.
+MAX_TAG_FACETS = 30  # Most common tags returned in the tag facet
+
+# Batch fetch Configuration
+MAX_BATCH_IDS = 50  # Upper bound on ids resolved by one batch request
+MAX_PRODUCT_NUMBER = 2**63 - 1  # Largest integer BSON can store
+
+# Bulk update Configuration
+MAX_BULK_UPDATE_ITEMS = 500  # Upper bound on per-product updates in one request
+BULK_STATE_PROJECTION = {"product_id": 1, "category": 1, "available": 1}  # What counters need
+
+# Export Configuration
+EXPORT_BATCH_SIZE = 500  # Documents per cursor batch and per streamed chunk
+EXPORT_FIELDS = [
+    "_id", "product_id", "slug", "name", "description", "price", "category", "available",
+    "discount", "tags", "images", "theme", "flavour", "created_at", "updated_at"
+]
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Sparse fieldset Configuration
+# Fields clients may request with fields=; "image" is the first image only
+PRODUCT_FIELDS = set(ProductPartialResponse.model_fields) | {"image"}
 
 # Create router instance with tags for API documentation
 router = APIRouter(
@@ -24,6 +67,39 @@ router = APIRouter(
     }
 )
 
+async def _validate_slug(
+    app: FastAPI,
+    slug: str,
+    exclude_id: Optional[ObjectId] = None,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> str:
+    """Normalize an admin supplied slug and make sure it is free.
+    
+    Args:
+        app: FastAPI application holding the collections
+        slug: Requested slug
+        exclude_id: Product being updated, which may keep its own slug
+        session: Admin session of the request
+        
+    Returns:
+        str: Normalized slug
+        
+    Raises:
+        HTTPException: 400 if the slug is empty or used by another product
+    """
+    normalized = slugify(slug)
+    if not normalized:
+        raise HTTPException(status_code=400, detail="Invalid slug")
+    query = {"slug": normalized}
+    if exclude_id is not None:
+        query["_id"] = {"$ne": exclude_id}
+    if await app.products.find_one(query, {"_id": 1}, session=session):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Product with this slug already exists"
+        )
+    return normalized
+
 @router.post("", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
 async def create_product(
     request: Request,
@@ -36,7 +112,9 @@ async def create_product(
     theme: str = Form(...),
     flavour: str = Form(...),
     image: UploadFile = File(...),
-    current_admin: dict = Depends(get_current_admin)
+    slug: Optional[str] = Form(None),
+    current_admin: dict = Depends(get_current_admin),
+    session: AsyncIOMotorClientSession = Depends(get_admin_session)
 ) -> dict:
     """Create a new product with image upload.
     
@@ -52,7 +130,9 @@ async def create_product(
         tags: JSON string of product tags
         discount: Discount percentage (0-100)
         image: Product image file
+        slug: Optional URL slug; defaults to the name plus the product number
         current_admin: Current admin user (injected by dependency)
+        session: Causal admin session (injected by dependency)
     
     Returns:
         dict: Created product data
@@ -60,14 +140,19 @@ async def create_product(
     Raises:
         HTTPException: 
             - 404: If category doesn't exist
-            - 400: If image format is invalid
+            - 400: If image format is invalid or the slug is taken
+            - 409: If the slug or product number was taken concurrently
             - 500: If image upload fails
             - 422: If tags JSON is invalid
     """
     # Validate category exists
-    if not await request.app.categories.find_one({"name": category}):
+    if not await request.app.categories.find_one({"name": category}, session=session):
         raise HTTPException(status_code=404, detail="Category not found")
     
+    # Validate a custom slug before uploading anything
+    if slug is not None:
+        slug = await _validate_slug(request.app, slug, session=session)
+    
     # Validate and save image
     if not is_valid_image(image):
         raise HTTPException(status_code=400, detail="Invalid image format")
@@ -85,10 +170,11 @@ async def create_product(
         raise HTTPException(status_code=400, detail="Invalid tags format")
     
     # Get next product_id
-    product_id = await get_next_product_id()
+    product_id = await get_next_product_id(request.app.mongodb)
     # Create product document with timestamps
     product = {
         "product_id": product_id,
+        "slug": slug or product_slug(name, product_id),
         "name": name,
         "description": description,
         "price": price,
@@ -99,127 +185,1101 @@ async def create_product(
         "tags": tags_list,
         "theme": theme,
         "flavour": flavour,
+        "version": 1,
         "created_at": datetime.utcnow(),
         "updated_at": datetime.utcnow()
     }
     
     # Insert into database
-    result = await request.app.products.insert_one(product)
+    try:
+        result = await request.app.products.insert_one(product, session=session)
+    except DuplicateKeyError:
+        # The slug was taken after validation, or the product number by an import
+        await delete_file(image_url)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Product with this slug or product number already exists"
+        )
     product["_id"] = str(result.inserted_id)
+    await adjust_available_product_counts(request.app.mongodb, after=product, session=session)
+    
+    # Drop cached listings the new product now appears in
+    await invalidate_products(request.app.mongodb, [product["_id"]], [category], session=session)
     return product
 
+def _build_product_filters(
+    theme: Optional[str] = None,
+    flavour: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_discount: Optional[float] = None
+) -> dict:
+    """Translate listing filter parameters into MongoDB conditions.
+    
+    Args:
+        theme: Exact theme to match
+        flavour: Exact flavour to match
+        tags: Products having any of these tags match
+        min_price: Inclusive lower price bound
+        max_price: Inclusive upper price bound
+        min_discount: Inclusive lower discount bound (percentage)
+        
+    Returns:
+        dict: Conditions to merge into the listing query
+    """
+    filters = {}
+    if theme is not None:
+        filters["theme"] = theme
+    if flavour is not None:
+        filters["flavour"] = flavour
+    if tags:
+        filters["tags"] = {"$in": tags}
+    price = {}
+    if min_price is not None:
+        price["$gte"] = min_price
+    if max_price is not None:
+        price["$lte"] = max_price
+    if price:
+        filters["price"] = price
+    if min_discount is not None:
+        filters["discount"] = {"$gte": min_discount}
+    return filters
+
+def _parse_fields(fields: Optional[str]) -> Optional[dict]:
+    """Translate a fields= parameter into a MongoDB find projection.
+    
+    name is always fetched because keyset cursors are built from it.
+    
+    Args:
+        fields: Comma separated field names, or None for whole documents
+        
+    Returns:
+        Optional[dict]: Projection, or None to fetch whole documents
+        
+    Raises:
+        HTTPException: 400 if an unknown field is requested
+    """
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - PRODUCT_FIELDS
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    projection = {field: 1 for field in requested | {"name"}}
+    if "image" in projection:
+        del projection["image"]
+        # Card grids only need the first image, let MongoDB trim the array
+        if "images" not in projection:
+            projection["images"] = {"$slice": 1}
+    return projection
+
+def _aggregation_projection(projection: dict) -> dict:
+    """Rewrite a find projection for use in an aggregation $project stage.
+    
+    Args:
+        projection: Projection built by _parse_fields
+        
+    Returns:
+        dict: Equivalent $project specification
+    """
+    stage = {}
+    for field, spec in projection.items():
+        if isinstance(spec, dict) and "$slice" in spec:
+            stage[field] = {"$slice": [f"${field}", spec["$slice"]]}
+        else:
+            stage[field] = spec
+    return stage
+
+def _partial_response(model, content: dict, response: Response) -> JSONResponse:
+    """Serialize a sparse-fieldset result, leaving out unrequested fields.
+    
+    Args:
+        model: Pydantic model that allows partial documents
+        content: Route result to validate
+        response: Response holding headers already set by the route
+        
+    Returns:
+        JSONResponse: Response carrying only the fetched fields
+    """
+    validated = model.model_validate(content)
+    return JSONResponse(
+        content=jsonable_encoder(validated.model_dump(exclude_unset=True)),
+        headers=dict(response.headers)
+    )
+
+def _facet_stages() -> dict:
+    """Build the $facet sub-pipelines for the filter sidebar counts.
+    
+    Returns:
+        dict: Facet name -> aggregation stages
+    """
+    def count_by(field: str) -> list:
+        return [
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}}
+        ]
+    
+    return {
+        "total": [{"$count": "count"}],
+        "themes": count_by("theme"),
+        "flavours": count_by("flavour"),
+        # Tags are an array, so count each tag of each product once
+        "tags": [{"$unwind": "$tags"}] + count_by("tags") + [{"$limit": MAX_TAG_FACETS}],
+        "price": [{
+            "$bucket": {
+                "groupBy": "$price",
+                "boundaries": PRICE_BUCKET_BOUNDARIES,
+                "default": "above",
+                "output": {"count": {"$sum": 1}}
+            }
+        }],
+        "discounted": [{"$match": {"discount": {"$gt": 0}}}, {"$count": "count"}]
+    }
+
+def _format_facets(raw: dict) -> dict:
+    """Convert raw $facet output into the response shape.
+    
+    Args:
+        raw: Single document produced by the $facet stage
+        
+    Returns:
+        dict: Value counts per facet plus price buckets
+    """
+    def values(buckets: list) -> list:
+        return [{"value": bucket["_id"], "count": bucket["count"]} for bucket in buckets if bucket["_id"] is not None]
+    
+    # Map $bucket lower boundaries back to [min, max) ranges
+    upper = dict(zip(PRICE_BUCKET_BOUNDARIES, PRICE_BUCKET_BOUNDARIES[1:]))
+    price = []
+    for bucket in raw.get("price", []):
+        if bucket["_id"] == "above":
+            price.append({"min": PRICE_BUCKET_BOUNDARIES[-1], "max": None, "count": bucket["count"]})
+        else:
+            price.append({"min": bucket["_id"], "max": upper[bucket["_id"]], "count": bucket["count"]})
+    
+    discounted = raw.get("discounted", [])
+    return {
+        "themes": values(raw.get("themes", [])),
+        "flavours": values(raw.get("flavours", [])),
+        "tags": values(raw.get("tags", [])),
+        "price": price,
+        "discounted": discounted[0]["count"] if discounted else 0
+    }
+
+def _empty_product_page(page: int, limit: int, facets: bool) -> dict:
+    """Build the response for a listing that can't match anything.
+    
+    Args:
+        page: Requested page number
+        limit: Requested page size
+        facets: Whether facet counts were requested
+        
+    Returns:
+        dict: Empty items with zeroed pagination (and facets)
+    """
+    return {
+        "items": [],
+        "pagination": {
+            "page": page,
+            "limit": limit,
+            "total_items": 0,
+            "total_pages": 0,
+            "has_next": False,
+            "has_prev": False,
+            "next_cursor": None
+        },
+        "facets": _format_facets({}) if facets else None
+    }
+
+async def _query_product_page(
+    app: FastAPI,
+    page: int,
+    limit: int,
+    category: Optional[str],
+    cursor: Optional[str],
+    include_total: bool,
+    filters: dict,
+    facets: bool,
+    projection: Optional[dict]
+) -> dict:
+    """Run the listing queries for one page of products.
+    
+    Args:
+        app: FastAPI application holding the collections
+        page: Page number (starts from 1), ignored when a cursor is given
+        limit: Number of items per page
+        category: Optional canonical category name to filter products
+        cursor: Optional keyset cursor
+        include_total: Whether to look up total_items/total_pages
+        filters: Extra conditions from _build_product_filters
+        facets: Whether to compute facet counts in the same round trip
+        projection: Optional find projection from _parse_fields
+        
+    Returns:
+        dict: Items, pagination details and facets as returned by list_products
+    """
+    # Build base query
+    query = {"available": True}  # Only return available products by default
+    
+    # Add category filter if provided
+    if category:
+        query["category"] = category
+    query.update(filters)
+    
+    if cursor:
+        # Keyset mode: continue strictly after the last item of the previous page
+        try:
+            last_name, last_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        page_query = keyset_filter(last_name, last_id)
+        skip = 0
+    else:
+        # Offset mode kept for existing page/limit clients
+        page_query = {}
+        skip = (page - 1) * limit
+    
+    total_count = None
+    facet_counts = None
+    # Anonymous catalog reads may be served by a secondary
+    products = catalog_reads(app.products)
+    async with catalog_read_session(app.mongodb) as session:
+        if facets:
+            # One aggregation returns the page, the total and every facet count.
+            # Facets are computed over the whole filtered set, not just this page.
+            facet_stages = _facet_stages()
+            facet_stages["items"] = [
+                {"$match": page_query},
+                {"$sort": dict(PRODUCT_SORT)},
+                {"$skip": skip},
+                {"$limit": limit + 1}  # One extra document to know whether another page exists
+            ]
+            if projection:
+                facet_stages["items"].append({"$project": _aggregation_projection(projection)})
+            pipeline = [{"$match": query}, {"$facet": facet_stages}]
+            raw = (await products.aggregate(pipeline, session=session).to_list(length=1))[0]
+            product_list = raw["items"]
+            total_count = raw["total"][0]["count"] if raw["total"] else 0
+            facet_counts = _format_facets(raw)
+        else:
+            if include_total:
+                if filters:
+                    # Counters only cover category listings, so count filtered queries
+                    total_count = await products.count_documents(query, session=session)
+                else:
+                    # Get total count for pagination from the maintained counters
+                    total_count = await get_available_product_count(app.mongodb, query.get("category"))
+        
+            # Fetch one extra document to know whether another page exists
+            find_query = {**query, **page_query}
+            products_cursor = products.find(find_query, projection, session=session).sort(PRODUCT_SORT).skip(skip).limit(limit + 1)
+            product_list = await products_cursor.to_list(length=None)
+    
+    has_more = len(product_list) > limit
+    product_list = product_list[:limit]
+    
+    # Build the cursor for the next page from the last item's sort key
+    next_cursor = None
+    if has_more:
+        last = product_list[-1]
+        next_cursor = encode_cursor(last["name"], last["_id"])
+    
+    # Convert ObjectId to string for each product
+    for product in product_list:
+        product["_id"] = str(product["_id"])
+    
+    # Calculate pagination details
+    total_pages = None
+    if total_count is not None:
+        total_pages = (total_count + limit - 1) // limit
+    
+    return {
+        "items": product_list,
+        "pagination": {
+            "page": None if cursor else page,
+            "limit": limit,
+            "total_items": total_count,
+            "total_pages": total_pages,
+            "has_next": has_more,
+            "has_prev": bool(cursor) or page > 1,
+            "next_cursor": next_cursor
+        },
+        "facets": facet_counts
+    }
+
+async def get_product_page(
+    app: FastAPI,
+    page: int = 1,
+    limit: int = 10,
+    category: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    filters: Optional[dict] = None,
+    facets: bool = False,
+    projection: Optional[dict] = None
+) -> dict:
+    """Get one page of products through the catalog cache.
+    
+    Entries are keyed by query shape and tagged with the category they
+    were filtered on, so product writes only drop the listings they touch.
+    
+    Args:
+        app: FastAPI application holding the collections
+        page: Page number (starts from 1), ignored when a cursor is given
+        limit: Number of items per page
+        category: Optional category name to filter products
+        cursor: Optional keyset cursor
+        include_total: Whether to look up total_items/total_pages
+        filters: Extra conditions from _build_product_filters
+        facets: Whether to compute facet counts
+        projection: Optional find projection from _parse_fields
+        
+    Returns:
+        dict: Items, pagination details and facets as returned by list_products
+    """
+    filters = filters or {}
+    if category:
+        # Resolve the case-insensitive name or slug from the in-memory map so
+        # the entry is keyed and tagged by the name writes invalidate
+        category_name = await category_resolver.resolve(app.categories, category)
+        if not category_name:
+            # Return empty result if category doesn't exist
+            return _empty_product_page(page, limit, facets)
+        category = category_name
+    key = (
+        "products:list",
+        None if cursor else page,
+        limit,
+        category,
+        cursor,
+        include_total,
+        json.dumps(filters, sort_keys=True),
+        facets,
+        json.dumps(projection, sort_keys=True) if projection else None
+    )
+    cached = catalog_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    # Remember the generation so a write racing this load isn't cached over
+    generation = catalog_cache.generation
+    result = await _query_product_page(
+        app, page, limit, category, cursor, include_total, filters, facets, projection
+    )
+    tags = [category_tag(category)] if category else [TAG_ALL_PRODUCTS]
+    catalog_cache.set(key, result, tags, generation=generation)
+    return result
+
+async def get_cached_product(
+    app: FastAPI,
+    lookup: tuple,
+    query: dict,
+    projection: Optional[dict] = None
+) -> Optional[dict]:
+    """Get a single product through the catalog cache.
+    
+    Args:
+        app: FastAPI application holding the collections
+        lookup: Hashable (field, value) pair identifying the product
+        query: MongoDB filter matching exactly that product
+        projection: Optional find projection from _parse_fields
+        
+    Returns:
+        Optional[dict]: Product with a string _id, or None if not found
+    """
+    key = ("products:item", lookup, json.dumps(projection, sort_keys=True) if projection else None)
+    cached = catalog_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    # Remember the generation so a write racing this load isn't cached over
+    generation = catalog_cache.generation
+    async with catalog_read_session(app.mongodb) as session:
+        product = await catalog_reads(app.products).find_one(query, projection, session=session)
+    if not product:
+        # Misses are not cached so new products show up immediately
+        return None
+    
+    # Convert ObjectId to string
+    product["_id"] = str(product["_id"])
+    catalog_cache.set(key, product, [product_tag(product["_id"])], generation=generation)
+    return product
+
+async def warm_product_cache(app: FastAPI) -> None:
+    """Preload the first page of the unfiltered product listing.
+    
+    Args:
+        app: FastAPI application holding the collections
+    """
+    await get_product_page(app)
+
 @router.get("", response_model=ProductListResponse)
 async def list_products(
     request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(10, ge=1, le=50, description="Items per page"),
-    category: Optional[str] = Query(None, description="Optional category name to filter products")
+    category: Optional[str] = Query(None, description="Optional category name to filter products"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous response's next_cursor"),
+    include_total: bool = Query(True, description="Set to false to skip total_items/total_pages"),
+    theme: Optional[str] = Query(None, description="Only products with this theme"),
+    flavour: Optional[str] = Query(None, description="Only products with this flavour"),
+    tags: Optional[List[str]] = Query(None, description="Only products with any of these tags"),
+    min_price: Optional[float] = Query(None, ge=0, description="Minimum price in NRs."),
+    max_price: Optional[float] = Query(None, ge=0, description="Maximum price in NRs."),
+    min_discount: Optional[float] = Query(None, ge=0, le=100, description="Minimum discount percentage"),
+    facets: bool = Query(False, description="Also return facet counts for the filter sidebar"),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return, e.g. name,price,discount,image")
 ) -> dict:
-    """List all products with pagination and optional category filtering.
+    """List all products with pagination, filters and optional facet counts.
     
     Args:
         request: FastAPI request object
-        page: Page number (starts from 1)
+        response: Response used to set ETag headers
+        page: Page number (starts from 1), ignored when a cursor is given
         limit: Number of items per page (between 1 and 50)
         category: Optional category name to filter products
+        cursor: Optional keyset cursor returned as next_cursor by a previous call
+        include_total: Whether to include total_items/total_pages (null when false)
+        theme: Optional exact theme filter
+        flavour: Optional exact flavour filter
+        tags: Optional tags, products having any of them match
+        min_price: Optional inclusive minimum price
+        max_price: Optional inclusive maximum price
+        min_discount: Optional inclusive minimum discount percentage
+        facets: Whether to include theme/flavour/tag counts and price buckets
+        fields: Optional sparse fieldset; "image" returns only the first image
         
     Returns:
         dict: Dictionary containing:
             - items: List of products for the current page
-            - pagination: Pagination details including total items and pages
+            - pagination: Pagination details including total items, pages
+              and the next_cursor to continue from
+            - facets: Facet counts over all matching products, or null
+            
+    Raises:
+        HTTPException:
+            - 400: If the cursor is malformed or an unknown field is requested
             
     Notes:
         - Returns all available products when no category is specified
-        - When category is provided, filters products by that category (case-insensitive)
-        - Results are sorted alphabetically by product name
+        - When category is provided, filters products by that category name
+          or slug (case-insensitive)
+        - Results are sorted alphabetically by product name, then by _id
+        - Cursor mode seeks directly past the previous page via the
+          (name, _id) index, so deep pages cost the same as the first one
+        - Totals come from counters maintained by the product write paths
+          when no extra filters are given
+        - With facets=true the page, total and facet counts come from a
+          single $facet aggregation
+        - Responses carry an ETag derived from the catalog version and
+          If-None-Match requests for the current version get 304
+        - With fields= only those fields (plus name) are fetched; a fieldset
+          that fits the (available, name, _id) index is a covered query
+        - With FAST_LIST_RESPONSES enabled, full documents skip response_model
+          validation and are encoded with orjson
     """
-    # Build base query
-    query = {"available": True}  # Only return available products by default
+    # Answer conditional requests without touching the database
+    not_modified = await check_catalog_etag(request, response)
+    if not_modified:
+        return not_modified
     
-    # Add category filter if provided
+    filters = _build_product_filters(theme, flavour, tags, min_price, max_price, min_discount)
+    projection = _parse_fields(fields)
+    result = await get_product_page(
+        request.app, page, limit, category, cursor, include_total, filters, facets, projection
+    )
+    if projection:
+        return _partial_response(ProductPartialListResponse, result, response)
+    if FAST_LIST_RESPONSES:
+        # Documents were validated on write, encode them directly
+        return FastJSONResponse(fast_product_list(result), headers=dict(response.headers))
+    return result
+
+@router.get("/search", response_model=ProductSearchResponse)
+async def search_products(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100, description="Search terms"),
+    page: int = Query(1, ge=1, description="Page number"),
+    limit: int = Query(10, ge=1, le=50, description="Items per page"),
+    category: Optional[str] = Query(None, description="Optional category name to restrict the search")
+) -> dict:
+    """Search available products by name and description.
+    
+    Uses the text index on name and description, so matching, ranking
+    and paging all happen in a single indexed query.
+    
+    Args:
+        request: FastAPI request object
+        response: Response used to set ETag headers
+        q: Search terms (supports "quoted phrases" and -negated words)
+        page: Page number (starts from 1)
+        limit: Number of items per page (between 1 and 50)
+        category: Optional category name or slug to restrict the search
+        
+    Returns:
+        dict: Dictionary containing:
+            - items: Matching products with their relevance score, best first
+            - pagination: Page details (has_next is known without counting)
+    """
+    # Answer conditional requests without touching the database
+    not_modified = await check_catalog_etag(request, response)
+    if not_modified:
+        return not_modified
+    
+    key = ("products:search", q, page, limit, category.casefold() if category else None)
+    cached = catalog_cache.get(key)
+    if cached is not None:
+        return cached
+    generation = catalog_cache.generation
+    
+    query = {"$text": {"$search": q}, "available": True}
     if category:
-        # Get category document to handle case-insensitive name
-        category_doc = await request.app.categories.find_one(
-            {"name": {"$regex": f"^{category}$", "$options": "i"}}
-        )
-        if category_doc:
-            query["category"] = category_doc["name"]
-        else:
-            # Return empty result if category doesn't exist
+        category_name = await category_resolver.resolve(request.app.categories, category)
+        if not category_name:
             return {
                 "items": [],
-                "pagination": {
-                    "page": page,
-                    "limit": limit,
-                    "total_items": 0,
-                    "total_pages": 0,
-                    "has_next": False,
-                    "has_prev": False
-                }
+                "pagination": {"page": page, "limit": limit, "has_next": False, "has_prev": page > 1}
             }
+        query["category"] = category_name
     
-    # Calculate skip for pagination
+    # Project the relevance score and leave out fields the response doesn't use
+    projection = {"score": {"$meta": "textScore"}, "created_at": 0, "updated_at": 0}
     skip = (page - 1) * limit
     
-    # Get total count for pagination
-    total_count = await request.app.products.count_documents(query)
-    
-    # Get products for current page
-    cursor = request.app.products.find(query).sort("name", 1).skip(skip).limit(limit)
-    product_list = await cursor.to_list(length=None)
+    # Fetch one extra document to know whether another page exists
+    async with catalog_read_session(request.app.mongodb) as session:
+        search_cursor = (
+            catalog_reads(request.app.products).find(query, projection, session=session)
+            .sort([("score", {"$meta": "textScore"}), ("_id", 1)])
+            .skip(skip)
+            .limit(limit + 1)
+        )
+        product_list = await search_cursor.to_list(length=None)
+    has_more = len(product_list) > limit
+    product_list = product_list[:limit]
     
     # Convert ObjectId to string for each product
     for product in product_list:
         product["_id"] = str(product["_id"])
     
-    # Calculate pagination details
-    total_pages = (total_count + limit - 1) // limit
-    
-    return {
+    result = {
         "items": product_list,
         "pagination": {
             "page": page,
             "limit": limit,
-            "total_items": total_count,
-            "total_pages": total_pages,
-            "has_next": page < total_pages,
+            "has_next": has_more,
             "has_prev": page > 1
         }
     }
+    # Results depend on every product, so any product write drops them
+    catalog_cache.set(key, result, [TAG_ALL_PRODUCTS], generation=generation)
+    return result
+
+def _parse_batch_id(raw_id: str) -> Optional[tuple]:
+    """Classify a requested id as an ObjectId or an integer product_id.
+    
+    Args:
+        raw_id: Id as given by the client
+        
+    Returns:
+        Optional[tuple]: (field, value) lookup pair, or None if invalid
+    """
+    # 24 hex characters are an ObjectId, even when they are all digits
+    if len(raw_id) == 24 and ObjectId.is_valid(raw_id):
+        return ("_id", str(ObjectId(raw_id)))
+    # isdecimal, not isdigit: int() rejects digits like "²"
+    if raw_id.isdecimal() and 0 < int(raw_id) <= MAX_PRODUCT_NUMBER:
+        return ("product_id", int(raw_id))
+    return None
+
+@router.get("/batch", response_model=ProductBatchResponse)
+async def batch_get_products(
+    request: Request,
+    response: Response,
+    ids: str = Query(..., description=f"Comma separated ObjectIds or product_ids (at most {MAX_BATCH_IDS})")
+) -> dict:
+    """Get several products in one round trip.
+    
+    Ids already in the catalog cache are served from memory; the rest are
+    resolved with a single $in query. ObjectIds and integer product_ids
+    can be mixed freely.
+    
+    Args:
+        request: FastAPI request object
+        response: Response used to set ETag headers
+        ids: Comma separated product ids
+        
+    Returns:
+        dict: One entry per requested id, in request order, with either
+            the product or a not_found/invalid_id marker
+            
+    Raises:
+        HTTPException:
+            - 400: If no ids or more than MAX_BATCH_IDS ids are given
+    """
+    raw_ids = [raw_id.strip() for raw_id in ids.split(",") if raw_id.strip()]
+    if not raw_ids or len(raw_ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Provide between 1 and {MAX_BATCH_IDS} ids"
+        )
+    
+    # Answer conditional requests without touching the database
+    not_modified = await check_catalog_etag(request, response)
+    if not_modified:
+        return not_modified
+    
+    lookups = {raw_id: _parse_batch_id(raw_id) for raw_id in raw_ids}
+    
+    # Serve what we can from the cache, collect the rest for one query
+    found = {}
+    missing_object_ids = set()
+    missing_product_ids = set()
+    for lookup in set(filter(None, lookups.values())):
+        cached = catalog_cache.get(("products:item", lookup, None))
+        if cached is not None:
+            found[lookup] = cached
+        elif lookup[0] == "_id":
+            missing_object_ids.add(ObjectId(lookup[1]))
+        else:
+            missing_product_ids.add(lookup[1])
+    
+    if missing_object_ids or missing_product_ids:
+        generation = catalog_cache.generation
+        query = {"$or": [
+            {"_id": {"$in": list(missing_object_ids)}},
+            {"product_id": {"$in": list(missing_product_ids)}}
+        ]}
+        async with catalog_read_session(request.app.mongodb) as session:
+            product_list = await catalog_reads(request.app.products).find(query, session=session).to_list(length=None)
+        for product in product_list:
+            product["_id"] = str(product["_id"])
+            tags = [product_tag(product["_id"])]
+            # Index the document under every lookup that could have asked for it
+            for lookup in (("_id", product["_id"]), ("product_id", product.get("product_id"))):
+                if lookup in lookups.values():
+                    found[lookup] = product
+                    catalog_cache.set(("products:item", lookup, None), product, tags, generation=generation)
+    
+    items = []
+    for raw_id in raw_ids:
+        lookup = lookups[raw_id]
+        if lookup is None:
+            items.append({"id": raw_id, "found": False, "error": "invalid_id"})
+        elif lookup in found:
+            items.append({"id": raw_id, "found": True, "product": found[lookup]})
+        else:
+            items.append({"id": raw_id, "found": False, "error": "not_found"})
+    return {"items": items}
+
+async def _bulk_filter_query(app: FastAPI, bulk_filter: ProductBulkFilter) -> dict:
+    """Translate a bulk update filter into a MongoDB query.
+    
+    Args:
+        app: FastAPI application holding the collections
+        bulk_filter: Conditions from the request
+        
+    Returns:
+        dict: MongoDB filter
+        
+    Raises:
+        HTTPException: 404 if the category doesn't exist
+    """
+    query = _build_product_filters(theme=bulk_filter.theme, flavour=bulk_filter.flavour, tags=bulk_filter.tags)
+    if bulk_filter.available is not None:
+        query["available"] = bulk_filter.available
+    if bulk_filter.category is not None:
+        category = await category_resolver.resolve(app.categories, bulk_filter.category)
+        if category is None:
+            raise HTTPException(status_code=404, detail="Category not found")
+        query["category"] = category
+    return query
+
+@router.patch("/bulk", response_model=ProductBulkUpdateResponse)
+async def bulk_update_products(
+    request: Request,
+    payload: ProductBulkUpdateRequest,
+    current_admin: dict = Depends(get_current_admin),
+    session: AsyncIOMotorClientSession = Depends(get_admin_session)
+) -> dict:
+    """Update price, discount or availability of many products at once.
+    
+    Only authenticated administrators can update products. Accepts either
+    a list of per-product updates or a filter with one update. The current
+    state of the targeted products is read with one query (for the
+    not_found report and the availability counters) and every change is
+    then written with one unordered bulk_write.
+    
+    Args:
+        request: FastAPI request object
+        payload: Per-product items, or filter and update
+        current_admin: Current admin user (injected by dependency)
+        session: Causal admin session (injected by dependency)
+        
+    Returns:
+        dict: Matched/modified counts and one result per targeted product
+        
+    Raises:
+        HTTPException:
+            - 400: If the payload mixes or omits both modes, has too many
+              items, or an update has no fields
+            - 404: If the filter's category doesn't exist
+            - 422: If the filter has no conditions
+    """
+    if payload.items is not None:
+        valid_mode = payload.filter is None and payload.update is None
+    else:
+        valid_mode = payload.filter is not None and payload.update is not None
+    if not valid_mode:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either items, or filter and update"
+        )
+    
+    now = datetime.utcnow()
+    operations = []
+    changes = []  # (before, after) pairs for the availability counters
+    items = []
+    
+    if payload.items is not None:
+        if not payload.items or len(payload.items) > MAX_BULK_UPDATE_ITEMS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Provide between 1 and {MAX_BULK_UPDATE_ITEMS} items"
+            )
+        updates = [item.update.model_dump(exclude_none=True) for item in payload.items]
+        if not all(updates):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No fields to update")
+        lookups = [_parse_batch_id(item.id.strip()) for item in payload.items]
+        
+        # Read the current state of every targeted product in one query
+        object_ids = [ObjectId(value) for field, value in filter(None, lookups) if field == "_id"]
+        product_ids = [value for field, value in filter(None, lookups) if field == "product_id"]
+        current = {}
+        query = {"$or": [{"_id": {"$in": object_ids}}, {"product_id": {"$in": product_ids}}]}
+        async for product in request.app.products.find(query, BULK_STATE_PROJECTION, session=session):
+            current[("_id", str(product["_id"]))] = product
+            current[("product_id", product.get("product_id"))] = product
+        
+        for item, lookup, fields in zip(payload.items, lookups, updates):
+            if lookup is None:
+                items.append({"id": item.id, "status": "invalid_id"})
+                continue
+            before = current.get(lookup)
+            if before is None:
+                items.append({"id": item.id, "status": "not_found"})
+                continue
+            operations.append(UpdateOne(
+                {"_id": before["_id"]},
+                {"$set": {**fields, "updated_at": now}, "$inc": {"version": 1}}
+            ))
+            after = {**before, **fields}
+            # Later items for the same product start from this one's result
+            current[("_id", str(before["_id"]))] = current[("product_id", before.get("product_id"))] = after
+            changes.append((before, after))
+            items.append({"id": item.id, "product_id": before.get("product_id"), "status": "updated"})
+    else:
+        fields = payload.update.model_dump(exclude_none=True)
+        if not fields:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No fields to update")
+        query = await _bulk_filter_query(request.app, payload.filter)
+        if not query:
+            # An empty filter would apply the update to the whole catalog
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="The filter needs at least one condition"
+            )
+        targets = await request.app.products.find(query, BULK_STATE_PROJECTION, session=session).to_list(length=None)
+        if targets:
+            # Update exactly the documents that were read, so the counters
+            # match even if other products start matching the filter meanwhile
+            operations.append(UpdateMany(
+                {"_id": {"$in": [product["_id"] for product in targets]}},
+                {"$set": {**fields, "updated_at": now}, "$inc": {"version": 1}}
+            ))
+        for product in targets:
+            changes.append((product, {**product, **fields}))
+            items.append({"id": str(product["_id"]), "product_id": product.get("product_id"), "status": "updated"})
+    
+    if not operations:
+        return {"matched": 0, "modified": 0, "items": items}
+    
+    # Single round trip for every change
+    result = await request.app.products.bulk_write(operations, ordered=False, session=session)
+    await apply_available_count_changes(request.app.mongodb, changes, session)
+    
+    # Drop cached reads for every touched product and its category
+    await invalidate_products(
+        request.app.mongodb,
+        {str(before["_id"]) for before, _ in changes},
+        {before.get("category") for before, _ in changes},
+        session=session
+    )
+    return {"matched": result.matched_count, "modified": result.modified_count, "items": items}
+
+def _csv_row(product: dict) -> list:
+    """Flatten a product document into an export CSV row.
+    
+    Args:
+        product: Product document as stored in MongoDB
+        
+    Returns:
+        list: Values in EXPORT_FIELDS order; lists are joined with "|"
+    """
+    row = []
+    for field in EXPORT_FIELDS:
+        value = product.get(field)
+        if isinstance(value, list):
+            value = "|".join(str(item) for item in value)
+        elif hasattr(value, "isoformat"):
+            value = value.isoformat()
+        row.append("" if value is None else value)
+    return row
+
+async def _export_chunks(app: FastAPI, export_format: str) -> AsyncIterator[bytes]:
+    """Stream the whole product collection as NDJSON or CSV chunks.
+    
+    Reads the collection with a batched cursor and yields one chunk per
+    batch, so memory use doesn't grow with the catalog size.
+    
+    Args:
+        app: FastAPI application holding the collections
+        export_format: "ndjson" or "csv"
+        
+    Yields:
+        bytes: Encoded chunk of rows
+    """
+    # CSV rows are written into a text buffer, NDJSON lines into a list
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    lines: List[bytes] = []
+    if export_format == "csv":
+        writer.writerow(EXPORT_FIELDS)
+    
+    def drain() -> bytes:
+        """Take everything buffered so far as one chunk"""
+        if export_format == "csv":
+            data = buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            return data
+        data = b"".join(lines)
+        lines.clear()
+        return data
+    
+    # Include unavailable products and walk the collection in _id order
+    export_cursor = app.products.find({}).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE)
+    count = 0
+    async for product in export_cursor:
+        if export_format == "csv":
+            writer.writerow(_csv_row(product))
+        else:
+            lines.append(dumps(product) + b"\n")
+        count += 1
+        # Flush once per cursor batch
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield drain()
+    
+    remaining = drain()
+    if remaining:
+        yield remaining
+
+@router.get("/export")
+async def export_products(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Export format: ndjson or csv"),
+    current_admin: dict = Depends(get_current_admin)
+) -> StreamingResponse:
+    """Stream the full catalog for partner feeds and reporting.
+    
+    Only authenticated administrators can export products. Unlike the
+    listing endpoints this includes unavailable products.
+    
+    Args:
+        request: FastAPI request object
+        format: "ndjson" (one JSON document per line) or "csv"
+        current_admin: Current admin user (injected by dependency)
+        
+    Returns:
+        StreamingResponse: Export body streamed straight from a MongoDB cursor
+    """
+    filename = f"products-{datetime.utcnow().strftime('%Y%m%d')}.{format}"
+    return StreamingResponse(
+        _export_chunks(request.app, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/import", response_model=ProductImportResponse)
+async def import_products(
+    request: Request,
+    file: UploadFile = File(..., description="CSV or XLSX file with one product per row"),
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=5000, description="Rows per batched insert"),
+    current_admin: dict = Depends(get_current_admin)
+) -> dict:
+    """Create many products from a spreadsheet.
+    
+    Only authenticated administrators can import products. Columns are
+    matched to product fields by header name; images are given as URLs.
+    Valid rows are inserted even when others fail, and every rejected
+    row is listed with its errors.
+    
+    Args:
+        request: FastAPI request object
+        file: Uploaded .csv or .xlsx file
+        batch_size: Number of rows written per insert_many
+        current_admin: Current admin user (injected by dependency)
+        
+    Returns:
+        dict: Inserted/failed counts and per-row errors
+        
+    Raises:
+        HTTPException: 400 if the file type is unsupported or required columns are missing
+    """
+    try:
+        rows = iter_spreadsheet_rows(file.file, file.filename)
+        return await run_product_import(request.app.mongodb, rows, batch_size)
+    except ValueError as e:
+        # Raised while reading the header, before anything is written
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+async def _read_product(
+    request: Request,
+    response: Response,
+    lookup: tuple,
+    query: dict,
+    fields: Optional[str]
+):
+    """Shared body of the single product read routes.
+    
+    Args:
+        request: FastAPI request object
+        response: Response used to set ETag headers
+        lookup: Hashable (field, value) pair used as the cache key
+        query: MongoDB filter matching exactly one product via a unique index
+        fields: Optional sparse fieldset
+        
+    Returns:
+        Product data, a partial response, or a 304 response
+        
+    Raises:
+        HTTPException:
+            - 404: If product not found
+            - 400: If an unknown field is requested
+    """
+    # Answer conditional requests without touching the database
+    not_modified = await check_catalog_etag(request, response)
+    if not_modified:
+        return not_modified
+    
+    projection = _parse_fields(fields)
+    
+    # Serve from the catalog cache when possible
+    product = await get_cached_product(request.app, lookup, query, projection)
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+    if projection:
+        return _partial_response(ProductPartialResponse, product, response)
+    return product
+
+@router.get("/by-number/{product_id}", response_model=ProductResponse)
+async def get_product_by_number(
+    request: Request,
+    response: Response,
+    product_id: int = Path(..., ge=1, le=MAX_PRODUCT_NUMBER),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return, e.g. name,price,image")
+) -> dict:
+    """Get a single product by its integer product number.
+    
+    Args:
+        request: FastAPI request object
+        response: Response used to set ETag headers
+        product_id: Product number assigned at creation
+        fields: Optional sparse fieldset; "image" returns only the first image
+        
+    Returns:
+        dict: Product data if found (304 if If-None-Match is current)
+        
+    Raises:
+        HTTPException:
+            - 404: If product not found
+            - 400: If an unknown field is requested
+            - 422: If the number is out of range
+    """
+    return await _read_product(request, response, ("product_id", product_id), {"product_id": product_id}, fields)
+
+@router.get("/by-slug/{slug}", response_model=ProductResponse)
+async def get_product_by_slug(
+    request: Request,
+    response: Response,
+    slug: str,
+    fields: Optional[str] = Query(None, description="Comma separated fields to return, e.g. name,price,image")
+) -> dict:
+    """Get a single product by its URL slug.
+    
+    Args:
+        request: FastAPI request object
+        response: Response used to set ETag headers
+        slug: Product slug, e.g. "black-forest-cake-42" (case-insensitive)
+        fields: Optional sparse fieldset; "image" returns only the first image
+        
+    Returns:
+        dict: Product data if found (304 if If-None-Match is current)
+        
+    Raises:
+        HTTPException:
+            - 404: If product not found
+            - 400: If an unknown field is requested
+    """
+    # Stored slugs are always lowercase, so normalize instead of using a collation
+    slug = slug.lower()
+    return await _read_product(request, response, ("slug", slug), {"slug": slug}, fields)
 
 @router.get("/{product_id}", response_model=ProductResponse)
-async def get_product(request: Request, product_id: str) -> dict:
+async def get_product(
+    request: Request,
+    response: Response,
+    product_id: str,
+    fields: Optional[str] = Query(None, description="Comma separated fields to return, e.g. name,price,image")
+) -> dict:
     """Get a single product by ID.
     
     Args:
         request: FastAPI request object
+        response: Response used to set ETag headers
         product_id: The ID of the product to retrieve
+        fields: Optional sparse fieldset; "image" returns only the first image
         
     Returns:
-        dict: Product data if found
+        dict: Product data if found (304 if If-None-Match is current)
         
     Raises:
         HTTPException:
             - 404: If product not found
-            - 400: If product ID format is invalid
+            - 400: If product ID format is invalid or an unknown field is requested
     """
     try:
-        product = await request.app.products.find_one({"_id": ObjectId(product_id)})
-        if not product:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Product not found"
-            )
-        
-        # Convert ObjectId to string
-        product["_id"] = str(product["_id"])
-        return product
-        
+        object_id = ObjectId(product_id)
     except InvalidId:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid product ID format"
         )
+    
+    # Keyed by the canonical id so equivalent spellings share one entry
+    return await _read_product(request, response, ("_id", str(object_id)), {"_id": object_id}, fields)
 
 @router.put("/{product_id}", response_model=ProductResponse)
 async def update_product(
@@ -235,12 +1295,17 @@ async def update_product(
     theme: Optional[str] = Form(None),
     flavour: Optional[str] = Form(None),
     image: Optional[UploadFile] = File(None),
-    current_admin: dict = Depends(get_current_admin)
+    slug: Optional[str] = Form(None),
+    version: Optional[int] = Form(None),
+    current_admin: dict = Depends(get_current_admin),
+    session: AsyncIOMotorClientSession = Depends(get_admin_session)
 ) -> dict:
     """Update a product with optional image upload.
     
     Only authenticated administrators can update products.
     Supports partial updates - only provided fields will be updated.
+    The product is changed with a single atomic find_one_and_update, so
+    concurrent image uploads are all kept.
     
     Args:
         request: FastAPI request object
@@ -252,8 +1317,12 @@ async def update_product(
         available: Updated availability status
         discount: Updated discount percentage
         tags: Updated JSON string of tags
-        image: New product image file
+        image: New product image file, appended to the product's images
+        slug: New URL slug
+        version: Version the client last read; the update is rejected if
+            the product changed since
         current_admin: Current admin user (injected by dependency)
+        session: Causal admin session (injected by dependency)
         
     Returns:
         dict: Updated product data
@@ -261,16 +1330,17 @@ async def update_product(
     Raises:
         HTTPException:
             - 404: If product or category not found
-            - 400: If image format is invalid
+            - 400: If the ID or image format is invalid or the slug is taken
+            - 409: If version is given and the product was modified since
             - 500: If image upload fails
             - 422: If tags JSON is invalid
     """
-    # Check if product exists
-    product = await request.app.products.find_one({"_id": ObjectId(product_id)})
-    if not product:
+    try:
+        object_id = ObjectId(product_id)
+    except InvalidId:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Product not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid product ID format"
         )
     
     # Prepare update data
@@ -283,7 +1353,7 @@ async def update_product(
         update_data["price"] = price
     if category is not None:
         # Validate category exists
-        if not await request.app.categories.find_one({"name": category}):
+        if not await request.app.categories.find_one({"name": category}, session=session):
             raise HTTPException(status_code=404, detail="Category not found")
         update_data["category"] = category
     if available is not None:
@@ -292,7 +1362,6 @@ async def update_product(
         update_data["discount"] = discount
     if tags is not None:
         try:
-            import json
             tags_list = json.loads(tags)
             if not isinstance(tags_list, list):
                 raise ValueError("Tags must be a list")
@@ -303,48 +1372,66 @@ async def update_product(
         update_data["theme"] = theme
     if flavour is not None:
         update_data["flavour"] = flavour
+    if slug is not None:
+        # Slugs only change on request so published URLs stay valid
+        update_data["slug"] = await _validate_slug(request.app, slug, exclude_id=object_id, session=session)
+    
+    if not update_data and not image:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No fields to update"
+        )
     
     # Handle image update
+    image_url = None
     if image:
         if not is_valid_image(image):
             raise HTTPException(status_code=400, detail="Invalid image format")
         image_url = await save_upload_file(image)
         if not image_url:
             raise HTTPException(status_code=500, detail="Error saving image")
-        # Add new image to images array
-        update_data["images"] = product.get("images", []) + [image_url]
-    
-    if not update_data:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="No fields to update"
-        )
     
     # Add updated timestamp
     update_data["updated_at"] = datetime.utcnow()
+    update = {"$set": update_data, "$inc": {"version": 1}}
+    if image_url:
+        # Appended server side, so concurrent uploads can't drop each other
+        update["$push"] = {"images": image_url}
     
-    # Update in database
-    result = await request.app.products.update_one(
-        {"_id": ObjectId(product_id)},
-        {"$set": update_data}
+    # One atomic round trip; the pre-image tells us the old category and
+    # availability for the counters, and the result is derived from it
+    product = await request.app.products.find_one_and_update(
+        {"_id": object_id, **version_filter(version)},
+        update,
+        return_document=ReturnDocument.BEFORE,
+        session=session
     )
+    if product is None:
+        if image_url:
+            await delete_file(image_url)
+        await raise_write_conflict(request.app.products, object_id, version, "Product")
     
-    if result.modified_count == 0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Product not updated"
-        )
+    updated_product = {**product, **update_data, "version": product.get("version", 0) + 1}
+    if image_url:
+        updated_product["images"] = product.get("images", []) + [image_url]
+    updated_product["_id"] = str(product["_id"])
+    await adjust_available_product_counts(request.app.mongodb, before=product, after=updated_product, session=session)
     
-    # Get updated product
-    updated_product = await request.app.products.find_one({"_id": ObjectId(product_id)})
-    updated_product["_id"] = str(updated_product["_id"])
+    # Drop cached reads for the product and both its old and new category
+    await invalidate_products(
+        request.app.mongodb,
+        [updated_product["_id"]],
+        [product.get("category"), updated_product.get("category")],
+        session=session
+    )
     return updated_product
 
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_product(
     request: Request,
     product_id: str,
-    current_admin: dict = Depends(get_current_admin)
+    current_admin: dict = Depends(get_current_admin),
+    session: AsyncIOMotorClientSession = Depends(get_admin_session)
 ) -> None:
     """Delete a product and its associated images.
     
@@ -354,14 +1441,24 @@ async def delete_product(
         request: FastAPI request object
         product_id: ID of the product to delete
         current_admin: Current admin user (injected by dependency)
+        session: Causal admin session (injected by dependency)
         
     Raises:
         HTTPException:
             - 404: If product not found
+            - 400: If product ID format is invalid
             - 401: If user is not authenticated as admin
     """
-    # Get product to delete its images
-    product = await request.app.products.find_one({"_id": ObjectId(product_id)})
+    try:
+        object_id = ObjectId(product_id)
+    except InvalidId:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid product ID format"
+        )
+    
+    # Delete product, getting the document back for its images and counters
+    product = await request.app.products.find_one_and_delete({"_id": object_id}, session=session)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -372,10 +1469,7 @@ async def delete_product(
     for image_url in product.get("images", []):
         await delete_file(image_url)
     
-    # Delete product
-    result = await request.app.products.delete_one({"_id": ObjectId(product_id)})
-    if result.deleted_count == 0:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Product not found"
-        ) 
\ No newline at end of file
+    await adjust_available_product_counts(request.app.mongodb, before=product, session=session)
+    
+    # Drop cached reads that still include the deleted product
+    await invalidate_products(request.app.mongodb, [str(product["_id"])], [product.get("category")], session=session)
\ No newline at end of file
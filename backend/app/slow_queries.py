@@ -0,0 +1,389 @@
+# Standard library imports
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+# Third-party imports
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Slow Query Configuration
+SLOW_QUERY_THRESHOLD_MS: float = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+SLOW_QUERY_MAX_ENTRIES: int = int(os.getenv("SLOW_QUERY_MAX_ENTRIES", "200"))
+SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS = 300.0  # Explain each query shape at most this often
+SLOW_QUERY_MAX_CONCURRENT_EXPLAINS = 2       # Explains are extra load on an already slow server
+
+# Commands whose shape is recorded; getMore and writes without a filter
+# (insert) say nothing about the query that was slow
+MONITORED_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+# Read commands that can be explained without side effects
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct"}
+# Fields describing the query; filters are normalized, the rest kept as is
+FILTER_FIELDS = ("filter", "query")
+VERBATIM_FIELDS = ("sort", "projection", "key", "hint")
+# Session and routing fields explain doesn't accept
+NON_EXPLAIN_FIELDS = {"lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern"}
+
+def normalize_filter(value: Any) -> Any:
+    """
+    Replace the literal values of a filter with "?"
+
+    Field names and operators are kept, so queries that differ only in
+    their values share one shape and no customer data is recorded.
+
+    Args:
+        value: Filter document or part of it
+
+    Returns:
+        Any: Normalized copy
+    """
+    if isinstance(value, dict):
+        return {key: normalize_filter(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)) and value and all(isinstance(item, dict) for item in value):
+        # $and/$or/$nor clauses are part of the shape
+        return [normalize_filter(item) for item in value]
+    return "?"
+
+def normalize_pipeline(pipeline: List[dict]) -> List[dict]:
+    """
+    Normalize an aggregation pipeline
+
+    $match filters and $skip/$limit amounts are normalized (recursing
+    into $facet); other stages describe the shape and are kept.
+
+    Args:
+        pipeline: Aggregation stages
+
+    Returns:
+        List[dict]: Normalized copy
+    """
+    stages = []
+    for stage in pipeline:
+        name, spec = next(iter(stage.items()))
+        if name == "$match":
+            spec = normalize_filter(spec)
+        elif name in ("$skip", "$limit"):
+            spec = "?"
+        elif name == "$facet":
+            spec = {facet: normalize_pipeline(sub_pipeline) for facet, sub_pipeline in spec.items()}
+        stages.append({name: spec})
+    return stages
+
+def query_shape(command_name: str, command: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the normalized shape of a command
+
+    Args:
+        command_name: Command name, e.g. "find"
+        command: Command document as sent to the server
+
+    Returns:
+        dict: Filter, pipeline, sort and similar fields with literals removed
+    """
+    shape: Dict[str, Any] = {}
+    for field in FILTER_FIELDS:
+        if field in command:
+            shape[field] = normalize_filter(command[field])
+    for field in VERBATIM_FIELDS:
+        if field in command:
+            shape[field] = command[field]
+    if "pipeline" in command:
+        shape["pipeline"] = normalize_pipeline(command["pipeline"])
+    # Batched writes: the first statement stands for the batch
+    for batch_field in ("updates", "deletes"):
+        if command.get(batch_field):
+            shape["filter"] = normalize_filter(command[batch_field][0].get("q", {}))
+    for field in ("skip", "limit"):
+        if command.get(field):
+            shape[field] = "?"
+    return shape
+
+def skip_amount(command: Dict[str, Any]) -> int:
+    """
+    Get the number of documents a command skips
+
+    Args:
+        command: Command document
+
+    Returns:
+        int: skip of a find, or the largest $skip stage of a pipeline
+    """
+    def pipeline_skip(pipeline: List[dict]) -> int:
+        largest = 0
+        for stage in pipeline:
+            if "$skip" in stage:
+                largest = max(largest, stage["$skip"])
+            elif "$facet" in stage:
+                largest = max([largest] + [pipeline_skip(sub) for sub in stage["$facet"].values()])
+        return largest
+
+    if "pipeline" in command:
+        return pipeline_skip(command["pipeline"])
+    return command.get("skip") or 0
+
+def summarize_plan(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce explain output to the stages and indexes of the winning plans
+
+    Handles find explains, aggregate explains (plans nested in $cursor
+    stages) and sharded explains (plans per shard).
+
+    Args:
+        explain: Result of the explain command
+
+    Returns:
+        dict: "stages" (e.g. ["LIMIT", "FETCH", "IXSCAN"]) and "indexes"
+    """
+    stages: List[str] = []
+    indexes: List[str] = []
+
+    def walk_stage(stage: Dict[str, Any]) -> None:
+        if "queryPlan" in stage:
+            # Slot based engine wraps the classic plan tree
+            stage = stage["queryPlan"]
+        if stage.get("stage"):
+            stages.append(stage["stage"])
+        if stage.get("indexName"):
+            indexes.append(stage["indexName"])
+        if "inputStage" in stage:
+            walk_stage(stage["inputStage"])
+        for child in stage.get("inputStages", []):
+            walk_stage(child)
+
+    def walk(document: Any) -> None:
+        if isinstance(document, dict):
+            planner = document.get("queryPlanner")
+            if isinstance(planner, dict) and "winningPlan" in planner:
+                walk_stage(planner["winningPlan"])
+            for key, value in document.items():
+                if key != "queryPlanner":
+                    walk(value)
+        elif isinstance(document, list):
+            for item in document:
+                walk(item)
+
+    walk(explain)
+    return {"stages": stages, "indexes": sorted(set(indexes))}
+
+def query_warnings(skip: int, plan: Optional[Dict[str, Any]]) -> List[str]:
+    """
+    Flag the usual causes of slow catalog queries
+
+    Args:
+        skip: Documents skipped by the query
+        plan: Plan summary from summarize_plan, if explained yet
+
+    Returns:
+        List[str]: Human readable warnings
+    """
+    warnings = []
+    if plan:
+        if "COLLSCAN" in plan["stages"]:
+            warnings.append("COLLSCAN: no index used, every document is scanned")
+        if "SORT" in plan["stages"]:
+            warnings.append("SORT: sorted in memory instead of by an index")
+    if skip:
+        warnings.append(f"skip: {skip} documents are read and thrown away; use a keyset cursor")
+    return warnings
+
+class SlowQueryRecorder(monitoring.CommandListener):
+    """
+    Command listener keeping the last slow queries with their shapes
+
+    Runs on the driver's threads, so it only records; explains of newly
+    seen slow shapes are handed to the event loop and run in the
+    background, at most once per shape every
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS. Per-shape state is kept for the
+    max_entries most recently seen shapes, which covers every recorded entry.
+    """
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_THRESHOLD_MS, max_entries: int = SLOW_QUERY_MAX_ENTRIES):
+        self.threshold_ms = threshold_ms
+        self.max_shapes = max_entries
+        self.entries: Deque[Dict[str, Any]] = deque(maxlen=max_entries)
+        # LRU by shape id, bounded by max_shapes
+        self.plans: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()   # shape id -> plan summary
+        self._explained_at: "OrderedDict[str, float]" = OrderedDict()    # shape id -> last explain (monotonic)
+        self._pending: Dict[Tuple[int, Any], Tuple[str, str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[AsyncIOMotorClient] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def start(self, database: AsyncIOMotorDatabase) -> None:
+        """
+        Enable background explains on the running event loop
+
+        Args:
+            database: Application database; its client runs the explains
+        """
+        self._loop = asyncio.get_running_loop()
+        self._client = database.client
+
+    async def stop(self) -> None:
+        """Cancel explains still running"""
+        self._loop = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def started(self, event) -> None:
+        if event.command_name in MONITORED_COMMANDS:
+            self._pending[(event.request_id, event.connection_id)] = (
+                event.database_name, event.command_name, event.command
+            )
+
+    def succeeded(self, event) -> None:
+        self._finish(event, failed=False)
+
+    def failed(self, event) -> None:
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool) -> None:
+        pending = self._pending.pop((event.request_id, event.connection_id), None)
+        if pending is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < self.threshold_ms:
+            return
+        database_name, command_name, command = pending
+        self.record(database_name, command_name, command, duration_ms, failed)
+
+    def record(
+        self,
+        database_name: str,
+        command_name: str,
+        command: Dict[str, Any],
+        duration_ms: float,
+        failed: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Record one slow command
+
+        Args:
+            database_name: Database the command ran in
+            command_name: Command name
+            command: Command document
+            duration_ms: Server round trip time in milliseconds
+            failed: Whether the command failed (e.g. hit maxTimeMS)
+
+        Returns:
+            dict: The recorded entry
+        """
+        collection = command.get(command_name)
+        shape = query_shape(command_name, command)
+        shape_key = json.dumps(
+            [database_name, collection, command_name, shape], sort_keys=True, default=str
+        ).encode()
+        shape_id = hashlib.blake2b(shape_key, digest_size=8).hexdigest()
+        entry = {
+            "recorded_at": datetime.utcnow(),
+            "database": database_name,
+            "collection": collection if isinstance(collection, str) else None,
+            "command": command_name,
+            "duration_ms": round(duration_ms, 3),
+            "failed": failed,
+            "shape_id": shape_id,
+            "shape": shape,
+            "skip": skip_amount(command)
+        }
+        with self._lock:
+            self.entries.append(entry)
+            explain = self._claim_explain(command_name, command, shape_id)
+            for shapes in (self._explained_at, self.plans):
+                if shape_id in shapes:
+                    shapes.move_to_end(shape_id)
+                self._trim(shapes)
+        if explain and self._loop is not None:
+            # Hand the explain to the event loop; we're on a driver thread
+            self._loop.call_soon_threadsafe(self._start_explain, database_name, command_name, command, shape_id)
+        logger.debug(f"Slow {command_name} on {database_name}.{entry['collection']}: {duration_ms:.1f} ms")
+        return entry
+
+    def _claim_explain(self, command_name: str, command: Dict[str, Any], shape_id: str) -> bool:
+        """Decide whether this shape is due for an explain (lock held)"""
+        if command_name not in EXPLAINABLE_COMMANDS:
+            return False
+        if command_name == "aggregate" and not isinstance(command.get("aggregate"), str):
+            return False  # Database level aggregations such as change streams
+        now = time.monotonic()
+        last = self._explained_at.get(shape_id)
+        if last is not None and now - last < SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS:
+            return False
+        self._explained_at[shape_id] = now
+        return True
+
+    def _trim(self, shapes: "OrderedDict[str, Any]") -> None:
+        """Drop the least recently seen shapes beyond max_shapes (lock held)"""
+        while len(shapes) > self.max_shapes:
+            shapes.popitem(last=False)
+
+    def _start_explain(self, database_name: str, command_name: str, command: Dict[str, Any], shape_id: str) -> None:
+        """Start a background explain (event loop thread)"""
+        if self._loop is None or len(self._tasks) >= SLOW_QUERY_MAX_CONCURRENT_EXPLAINS:
+            with self._lock:
+                self._explained_at.pop(shape_id, None)  # Try again next time it is slow
+            return
+        task = self._loop.create_task(self._explain(database_name, command, shape_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, database_name: str, command: Dict[str, Any], shape_id: str) -> None:
+        """Explain a command with the queryPlanner verbosity (nothing is executed)"""
+        explained = {
+            key: value for key, value in command.items()
+            if not key.startswith("$") and key not in NON_EXPLAIN_FIELDS
+        }
+        try:
+            result = await self._client[database_name].command(
+                {"explain": explained, "verbosity": "queryPlanner"}
+            )
+        except Exception as e:
+            logger.debug(f"Could not explain slow query {shape_id}: {str(e)}")
+            return
+        plan = summarize_plan(result)
+        with self._lock:
+            self.plans[shape_id] = plan
+            self._trim(self.plans)
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get recorded slow queries, newest first, with plans and warnings
+
+        Args:
+            limit: Maximum number of entries
+
+        Returns:
+            List[dict]: Entries including "plan" (None until explained)
+                and "warnings"
+        """
+        with self._lock:
+            entries = list(self.entries)
+        entries.reverse()
+        if limit is not None:
+            entries = entries[:limit]
+        result = []
+        for entry in entries:
+            plan = self.plans.get(entry["shape_id"])
+            result.append({**entry, "plan": plan, "warnings": query_warnings(entry["skip"], plan)})
+        return result
+
+    def clear(self) -> None:
+        """Forget recorded queries and plans"""
+        with self._lock:
+            self.entries.clear()
+            self.plans.clear()
+            self._explained_at.clear()
+
+# Slow query recorder registered on the MongoDB client
+slow_query_recorder = SlowQueryRecorder()
@@ -0,0 +1,143 @@
+# Standard library imports
+import asyncio
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+# Third-party imports
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+# Local imports
+from .utils.encoding import SUPPORTED_ENCODINGS, compress
+from .utils.pagination import PRODUCT_SORT
+from .utils.serialization import dumps, trusted_product
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Snapshot Configuration
+SNAPSHOT_REBUILD_DELAY_SECONDS = 1.0  # Coalesce bursts of writes into one rebuild
+
+class CatalogSnapshot:
+    """
+    Pre-rendered, pre-compressed copy of the whole available catalog
+
+    The snapshot is the storefront's hottest read: every available product
+    grouped by category. It is rendered to JSON bytes once, compressed once
+    per supported encoding, and then served as a plain memory copy until a
+    catalog write marks it stale.
+    """
+
+    def __init__(self, rebuild_delay: float = SNAPSHOT_REBUILD_DELAY_SECONDS):
+        self.rebuild_delay = rebuild_delay
+        # Content coding ("identity", "gzip", "br") -> encoded body
+        self.variants: Dict[str, bytes] = {}
+        self._etag: Optional[str] = None
+        self.built_at: Optional[datetime] = None
+        self.stale = True
+        # Bumped on invalidation so a rebuild racing a write stays stale
+        self._generation = 0
+        self._lock = asyncio.Lock()
+        self._scheduled: Optional[asyncio.Task] = None
+
+    def invalidate(self, database: Optional[AsyncIOMotorDatabase] = None) -> None:
+        """
+        Mark the snapshot stale and schedule a background rebuild
+
+        Args:
+            database: Database to rebuild from; when omitted the snapshot
+                is rebuilt by the next request instead
+        """
+        self._generation += 1
+        self.stale = True
+        if database is None:
+            return
+        if self._scheduled is None or self._scheduled.done():
+            try:
+                self._scheduled = asyncio.get_running_loop().create_task(self._delayed_rebuild(database))
+            except RuntimeError:
+                # No running loop (e.g. called from a script), rebuild lazily
+                self._scheduled = None
+
+    async def _delayed_rebuild(self, database: AsyncIOMotorDatabase) -> None:
+        """Rebuild after a short delay so write bursts cause one rebuild"""
+        await asyncio.sleep(self.rebuild_delay)
+        try:
+            await self.ensure_fresh(database)
+        except Exception as e:
+            # The next request retries the rebuild
+            logger.error(f"Error rebuilding catalog snapshot: {str(e)}")
+
+    async def ensure_fresh(self, database: AsyncIOMotorDatabase) -> None:
+        """
+        Rebuild the snapshot if it is stale
+
+        Concurrent callers wait for a single rebuild instead of each
+        querying MongoDB.
+
+        Args:
+            database: Database holding the products and categories collections
+        """
+        if not self.stale:
+            return
+        async with self._lock:
+            if self.stale:
+                await self._rebuild(database)
+
+    async def _rebuild(self, database: AsyncIOMotorDatabase) -> None:
+        """Render and compress the catalog"""
+        generation = self._generation
+
+        categories = await database.categories.find(
+            {}, {"name": 1, "slug": 1, "description": 1, "images": 1}
+        ).sort("name", 1).to_list(length=None)
+        products = await database.products.find(
+            {"available": True}, {"created_at": 0, "updated_at": 0}
+        ).sort(PRODUCT_SORT).to_list(length=None)
+
+        # Group products under their category, keeping category order
+        grouped = {
+            category["name"]: {
+                "name": category["name"],
+                "slug": category.get("slug"),
+                "description": category.get("description"),
+                "images": category.get("images", []),
+                "products": []
+            }
+            for category in categories
+        }
+        for product in products:
+            group = grouped.get(product.get("category"))
+            if group is not None:
+                group["products"].append(trusted_product(product))
+
+        body = dumps({"categories": list(grouped.values())})
+        variants = {"identity": body}
+        # Compress off the event loop, large catalogs take a while with brotli
+        loop = asyncio.get_running_loop()
+        for encoding in SUPPORTED_ENCODINGS:
+            variants[encoding] = await loop.run_in_executor(None, compress, body, encoding)
+
+        self.variants = variants
+        # Content hash, so identical rebuilds keep the same ETag
+        self._etag = f'"snapshot-{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        self.built_at = datetime.utcnow()
+        # Stay stale if a write happened while we were reading
+        self.stale = generation != self._generation
+        logger.info(
+            f"Catalog snapshot rebuilt: {len(products)} products, "
+            + ", ".join(f"{name}={len(data)}B" for name, data in variants.items())
+        )
+
+    def etag(self) -> Optional[str]:
+        """
+        Get the ETag of the uncompressed snapshot
+
+        Returns:
+            Optional[str]: Quoted entity tag, None before the first build
+        """
+        return self._etag
+
+# Shared catalog snapshot
+catalog_snapshot = CatalogSnapshot()
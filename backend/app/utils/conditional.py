@@ -0,0 +1,113 @@
+# Standard library imports
+from typing import NoReturn, Optional
+
+# Third-party imports
+from bson import ObjectId
+from fastapi import HTTPException, Request, Response, status
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+# Local imports
+from ..cache import catalog_version
+
+# Catalog responses may be stored but must be revalidated before reuse
+CATALOG_CACHE_CONTROL = "no-cache"
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an entity tag
+
+    Uses the weak comparison required for If-None-Match, so W/ prefixes
+    added by intermediaries don't prevent a match.
+
+    Args:
+        if_none_match: Raw If-None-Match header value
+        etag: Current quoted entity tag
+
+    Returns:
+        bool: True if the client already has this representation
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+async def check_catalog_etag(request: Request, response: Response) -> Optional[Response]:
+    """
+    Apply catalog ETag handling to a read route
+
+    Sets the ETag and Cache-Control headers on the outgoing response and
+    short-circuits with 304 when the client's copy is still current. The
+    ETag is taken before any data is loaded, so it never claims a newer
+    version than the body it is sent with.
+
+    Args:
+        request: Incoming request
+        response: Response whose headers the route will return
+
+    Returns:
+        Optional[Response]: A 304 response to return as-is, or None to
+            continue building the full response
+    """
+    await catalog_version.refresh(request.app.mongodb)
+    etag = catalog_version.etag()
+    headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+def version_filter(version: Optional[int]) -> dict:
+    """
+    Build the query condition for an optimistic concurrency check
+
+    Writes that pass the version a client last read only match if nobody
+    changed the document since; writes without a version always match.
+
+    Args:
+        version: Version the client expects the document to be at
+
+    Returns:
+        dict: Conditions to merge into the write's filter
+    """
+    if version is None:
+        return {}
+    if version == 0:
+        # Documents written before versioning have no version field
+        return {"version": {"$in": [0, None]}}
+    return {"version": version}
+
+async def raise_write_conflict(
+    collection: AsyncIOMotorCollection,
+    object_id: ObjectId,
+    version: Optional[int],
+    label: str
+) -> NoReturn:
+    """
+    Explain why a versioned write matched no document
+
+    Only called on the failure path, so successful writes stay one round trip.
+
+    Args:
+        collection: Collection the write targeted
+        object_id: Id of the targeted document
+        version: Version the client expected, if any
+        label: Name of the document type for the error message
+
+    Raises:
+        HTTPException:
+            - 409: If the document exists but is at another version
+            - 404: If the document doesn't exist
+    """
+    if version is not None and await collection.find_one({"_id": object_id}, {"_id": 1}):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{label} was modified by someone else, reload it and try again"
+        )
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{label} not found")
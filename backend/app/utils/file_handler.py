@@ -7,6 +7,9 @@ from typing import Optional
 from fastapi import UploadFile
 import aiofiles
 
+# Local imports
+from ..metrics import upload_bytes
+
 # Constants
 UPLOAD_DIR = "uploads"
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "webp"}
@@ -52,6 +55,7 @@ async def save_upload_file(file: UploadFile) -> Optional[str]:
             if len(content) > MAX_FILE_SIZE:
                 return None
             await buffer.write(content)
+        upload_bytes.inc(len(content))
         
         return f"/uploads/{filename}"
     
@@ -0,0 +1,69 @@
+# Standard library imports
+import base64
+import json
+from typing import Any, Dict, Tuple
+
+# Third-party imports
+from bson import ObjectId
+from bson.errors import InvalidId
+
+# Sort order shared by offset and keyset pagination.
+# _id breaks ties between products with the same name so every
+# document has exactly one position in the listing.
+PRODUCT_SORT = [("name", 1), ("_id", 1)]
+
+def encode_cursor(name: str, object_id: ObjectId) -> str:
+    """
+    Encode the sort key of the last item on a page into an opaque cursor
+
+    Args:
+        name: Product name of the last item
+        object_id: ObjectId of the last item
+
+    Returns:
+        str: URL-safe cursor token
+    """
+    raw = json.dumps([name, str(object_id)], separators=(",", ":")).encode("utf-8")
+    # Strip padding so the token can be dropped into a query string as-is
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, ObjectId]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Opaque cursor token from a previous response
+
+    Returns:
+        Tuple[str, ObjectId]: Product name and ObjectId to continue after
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        # Restore the padding removed by encode_cursor
+        padded = cursor + "=" * (-len(cursor) % 4)
+        name, object_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(name, str):
+            raise ValueError("Cursor name must be a string")
+        return name, ObjectId(object_id)
+    except (ValueError, TypeError, InvalidId, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+def keyset_filter(name: str, object_id: ObjectId) -> Dict[str, Any]:
+    """
+    Build a query that matches documents sorted after (name, _id)
+
+    Args:
+        name: Product name of the last item already returned
+        object_id: ObjectId of the last item already returned
+
+    Returns:
+        dict: MongoDB filter to be combined with the listing query
+    """
+    return {
+        "$or": [
+            {"name": {"$gt": name}},
+            {"name": name, "_id": {"$gt": object_id}}
+        ]
+    }
@@ -0,0 +1,100 @@
+# Standard library imports
+import os
+from datetime import date, datetime
+from typing import Any, Dict, List
+
+# Third-party imports
+import orjson
+from bson import ObjectId
+from fastapi import Response
+
+# Local imports
+from ..models import ProductResponse
+
+# Serialization Configuration
+# When enabled, product and category list routes skip response_model
+# validation and encode documents (already validated on write) with orjson.
+FAST_LIST_RESPONSES: bool = os.getenv("FAST_LIST_RESPONSES", "false").lower() in ("1", "true", "yes")
+
+# Fields ProductResponse exposes, with the defaults it would fill in
+PRODUCT_RESPONSE_FIELDS: List[str] = list(ProductResponse.model_fields)
+PRODUCT_RESPONSE_DEFAULTS: Dict[str, Any] = {
+    name: field.get_default(call_default_factory=True)
+    for name, field in ProductResponse.model_fields.items()
+    if not field.is_required()
+}
+
+def _default(obj: Any) -> Any:
+    """
+    Encode types orjson doesn't know natively
+
+    Args:
+        obj: Value orjson couldn't serialize
+
+    Returns:
+        Any: JSON compatible replacement
+
+    Raises:
+        TypeError: If the type isn't supported either
+    """
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode content straight to JSON bytes
+
+    Args:
+        content: JSON compatible data, may contain ObjectId and datetime values
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    # Non-str dict keys (e.g. ints) are stringified like the json module does
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+class FastJSONResponse(Response):
+    """JSON response rendered with orjson instead of json.dumps"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def trusted_product(product: dict) -> dict:
+    """
+    Shape a stored product like ProductResponse without validating it
+
+    Args:
+        product: Product document as stored in MongoDB
+
+    Returns:
+        dict: Only the fields ProductResponse exposes, with its defaults
+    """
+    shaped = {}
+    for name in PRODUCT_RESPONSE_FIELDS:
+        if name in product:
+            shaped[name] = product[name]
+        elif name in PRODUCT_RESPONSE_DEFAULTS:
+            shaped[name] = PRODUCT_RESPONSE_DEFAULTS[name]
+    return shaped
+
+def fast_product_list(content: dict) -> dict:
+    """
+    Shape a product list result like ProductListResponse without validating it
+
+    Args:
+        content: Result of list_products
+
+    Returns:
+        dict: Same structure with each item reduced to response fields
+    """
+    return {
+        "items": [trusted_product(product) for product in content["items"]],
+        "pagination": content["pagination"],
+        "facets": content.get("facets")
+    }
@@ -0,0 +1,24 @@
+# Standard library imports
+from typing import AsyncIterator
+
+# Third-party imports
+from fastapi import Request
+from motor.motor_asyncio import AsyncIOMotorClientSession
+
+async def get_admin_session(request: Request) -> AsyncIterator[AsyncIOMotorClientSession]:
+    """
+    Causally consistent session for one admin request
+
+    Admin routes read what they have just written (existence checks, the
+    counters, the catalog version), so their reads and writes share one
+    causal session on the primary instead of the secondaries anonymous
+    catalog reads may use.
+
+    Args:
+        request: FastAPI request object
+
+    Yields:
+        AsyncIOMotorClientSession: Session to pass to every query of the request
+    """
+    async with await request.app.mongodb.client.start_session(causal_consistency=True) as session:
+        yield session
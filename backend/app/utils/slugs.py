@@ -0,0 +1,37 @@
+# Standard library imports
+import re
+import unicodedata
+
+# Runs of anything that isn't a lowercase letter or digit become one hyphen
+_NON_SLUG_CHARS = re.compile(r"[^a-z0-9]+")
+
+def slugify(text: str) -> str:
+    """
+    Turn free text into a URL-safe slug
+
+    Args:
+        text: Text such as a product name
+
+    Returns:
+        str: Lowercase ASCII slug, e.g. "Black Forest Cake" -> "black-forest-cake"
+    """
+    # Drop accents so "Crème Brûlée" becomes "creme-brulee"
+    ascii_text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return _NON_SLUG_CHARS.sub("-", ascii_text.lower()).strip("-")
+
+def product_slug(name: str, product_id: int) -> str:
+    """
+    Build the default slug for a product
+
+    The product number is appended so two products with the same name
+    never collide on the unique slug index.
+
+    Args:
+        name: Product name
+        product_id: Integer product number
+
+    Returns:
+        str: Slug such as "black-forest-cake-42"
+    """
+    base = slugify(name)
+    return f"{base}-{product_id}" if base else str(product_id)
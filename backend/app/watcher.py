@@ -0,0 +1,199 @@
+# Standard library imports
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+# Third-party imports
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
+
+# Local imports
+from .database import CATALOG_VERSION_ID, catalog_write_clock
+from .cache import (
+    catalog_cache, category_resolver, catalog_version,
+    category_tag, product_tag, TAG_ALL_PRODUCTS, TAG_CATEGORIES
+)
+from .snapshot import catalog_snapshot
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Watcher Configuration
+WATCH_POLL_SECONDS = 2.0    # Version polling interval when change streams are unavailable
+WATCH_RETRY_SECONDS = 1.0   # First delay before reopening a failed change stream
+WATCH_MAX_RETRY_SECONDS = 30.0
+
+# Server error codes
+NOT_A_REPLICA_SET = 40573   # $changeStream needs a replica set or sharded cluster
+# The resume token can't be used any more; events may have been missed
+LOST_RESUME_CODES = {260, 280, 286}  # InvalidResumeToken, ChangeStreamFatalError, ChangeStreamHistoryLost
+
+# Category fields maintained by product writes (see apply_available_count_changes)
+CATEGORY_COUNT_FIELDS = {"product_count", "available_count"}
+
+# Only catalog collections and the catalog version document are watched
+WATCH_PIPELINE = [
+    {"$match": {"$or": [
+        {"ns.coll": {"$in": ["products", "categories"]}},
+        {"ns.coll": "counters", "documentKey._id": CATALOG_VERSION_ID}
+    ]}}
+]
+
+class CatalogChangeWatcher:
+    """
+    Background task keeping this worker's catalog caches in sync
+
+    Every uvicorn worker runs one watcher. Writes handled by other workers
+    arrive as change stream events and drop the affected cache entries,
+    the category resolver and the snapshot here too. On a standalone
+    mongod, where change streams don't exist, the watcher instead polls
+    the shared catalog version.
+    """
+
+    def __init__(self, poll_seconds: float = WATCH_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.mode = "stopped"       # "change_stream", "polling" or "stopped"
+        self.resume_token: Optional[Dict[str, Any]] = None
+        self.events = 0
+        self.reconnects = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, database: AsyncIOMotorDatabase) -> None:
+        """
+        Start watching in the background
+
+        Args:
+            database: Database holding the catalog collections
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(database))
+
+    async def stop(self) -> None:
+        """Stop the background task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.mode = "stopped"
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get watcher state
+
+        Returns:
+            dict: Mode, events applied and stream reconnects
+        """
+        return {"mode": self.mode, "events": self.events, "reconnects": self.reconnects}
+
+    async def _run(self, database: AsyncIOMotorDatabase) -> None:
+        """Consume the change stream, reopening it after failures"""
+        delay = WATCH_RETRY_SECONDS
+        while True:
+            events_before = self.events
+            try:
+                await self._watch(database)
+            except OperationFailure as e:
+                if e.code == NOT_A_REPLICA_SET:
+                    logger.warning("Change streams unavailable (standalone mongod), polling the catalog version")
+                    await self._poll(database)
+                    return
+                if e.code in LOST_RESUME_CODES:
+                    # Can't know what we missed, start over from a clean cache
+                    logger.warning(f"Change stream resume token lost: {str(e)}")
+                    self.resume_token = None
+                    self._invalidate_everything(database)
+                else:
+                    logger.error(f"Change stream failed: {str(e)}")
+            except PyMongoError as e:
+                logger.error(f"Change stream interrupted: {str(e)}")
+            # Back off, then resume from the last token so nothing is missed
+            if self.events > events_before:
+                delay = WATCH_RETRY_SECONDS  # The stream was healthy for a while
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WATCH_MAX_RETRY_SECONDS)
+
+    async def _watch(self, database: AsyncIOMotorDatabase) -> None:
+        """Apply events until the stream is closed or fails"""
+        async with database.watch(
+            WATCH_PIPELINE,
+            full_document="updateLookup",
+            resume_after=self.resume_token
+        ) as stream:
+            self.mode = "change_stream"
+            logger.info("Watching catalog changes")
+            async for change in stream:
+                self._apply(database, change)
+                self.events += 1
+                # Remember how far we got, so a reconnect resumes here
+                self.resume_token = stream.resume_token
+        # The stream was invalidated (e.g. the database was dropped)
+        self.resume_token = None
+        self._invalidate_everything(database)
+
+    async def _poll(self, database: AsyncIOMotorDatabase) -> None:
+        """Fallback: re-read the shared catalog version on an interval"""
+        self.mode = "polling"
+        while True:
+            try:
+                # Clears the local caches whenever the version moved forward
+                await catalog_version.refresh(database, force=True)
+            except PyMongoError as e:
+                logger.error(f"Error polling catalog version: {str(e)}")
+            await asyncio.sleep(self.poll_seconds)
+
+    def _apply(self, database: AsyncIOMotorDatabase, change: Dict[str, Any]) -> None:
+        """
+        Drop the local cached state a change event affects
+
+        Args:
+            database: Database the event came from
+            change: Change stream event
+        """
+        collection = change.get("ns", {}).get("coll")
+        operation = change["operationType"]
+        document = change.get("fullDocument") or {}
+        # Secondary reads refilling what this drops must include the write
+        catalog_write_clock.observe(change.get("clusterTime"))
+
+        if collection == "counters":
+            # Keep ETags in step without waiting for the next version refresh
+            if document.get("seq") is not None:
+                catalog_version.observe(document["seq"])
+            return
+
+        if collection == "products" and operation in ("insert", "update"):
+            updated_fields = change.get("updateDescription", {}).get("updatedFields", {})
+            if document and "category" not in updated_fields:
+                # The category is known, so only the affected entries go
+                tags = [TAG_ALL_PRODUCTS, TAG_CATEGORIES, product_tag(str(change["documentKey"]["_id"]))]
+                if document.get("category"):
+                    tags.append(category_tag(document["category"]))
+                catalog_cache.invalidate_tags(*tags)
+                catalog_snapshot.invalidate(database)
+                return
+
+        if collection == "categories" and operation == "update":
+            description = change.get("updateDescription", {})
+            changed = set(description.get("updatedFields", {})) | set(description.get("removedFields", []))
+            if changed and changed <= CATEGORY_COUNT_FIELDS:
+                # Count updates from a product write, whose own event drops
+                # the product entries; only the category lists carry counts
+                catalog_cache.invalidate_tags(TAG_CATEGORIES)
+                return
+
+        # Deletes, replacements, category moves and category writes don't
+        # tell us the old category name; these are rare, so drop everything
+        self._invalidate_everything(database)
+
+    def _invalidate_everything(self, database: AsyncIOMotorDatabase) -> None:
+        """Drop all local catalog state"""
+        catalog_cache.clear()
+        category_resolver.invalidate()
+        catalog_snapshot.invalidate(database)
+
+# Shared watcher for this worker process
+catalog_watcher = CatalogChangeWatcher()
@@ -0,0 +1,63 @@
+"""
+Give products created before slugs existed their default slug
+
+The default slug includes the product number, so legacy products without
+a product_id are skipped and reported; give them a slug by hand.
+
+Run from the backend directory:
+    python -m scripts.backfill_product_slugs
+"""
+import asyncio
+
+from pymongo import UpdateOne
+
+from app.database import connect_db, close_db, bump_catalog_version
+from app.utils.slugs import product_slug
+
+BATCH_SIZE = 500
+
+async def backfill_product_slugs(database) -> int:
+    """Set the default slug on every numbered product without one, in batches"""
+    products = database.products
+    updated = 0
+    operations = []
+    cursor = products.find(
+        {"slug": {"$exists": False}, "product_id": {"$type": "number"}},
+        {"name": 1, "product_id": 1}
+    )
+    async for product in cursor:
+        operations.append(UpdateOne(
+            # Guard against a slug set concurrently by an admin
+            {"_id": product["_id"], "slug": {"$exists": False}},
+            {"$set": {"slug": product_slug(product["name"], product["product_id"])}}
+        ))
+        if len(operations) >= BATCH_SIZE:
+            updated += (await products.bulk_write(operations, ordered=False)).modified_count
+            operations = []
+    if operations:
+        updated += (await products.bulk_write(operations, ordered=False)).modified_count
+    if updated:
+        # Let running workers drop their cached copies
+        await bump_catalog_version(database)
+    return updated
+
+async def count_unnumbered_products(database) -> int:
+    """Count products the backfill can't give a default slug"""
+    return await database.products.count_documents({
+        "slug": {"$exists": False},
+        "product_id": {"$not": {"$type": "number"}}
+    })
+
+async def main() -> tuple:
+    """Connect, backfill and disconnect"""
+    database = await connect_db()
+    try:
+        return await backfill_product_slugs(database), await count_unnumbered_products(database)
+    finally:
+        close_db()
+
+if __name__ == "__main__":
+    updated, skipped = asyncio.run(main())
+    print(f"Backfilled {updated} product slugs")
+    if skipped:
+        print(f"Skipped {skipped} products without a product_id")
@@ -0,0 +1,80 @@
+"""
+Compare the default and fast serialization paths for product list responses
+
+Run from the backend directory:
+    python -m scripts.benchmark_serialization
+"""
+import json
+import timeit
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from app.models import ProductListResponse
+from app.utils.serialization import dumps, fast_product_list
+
+PAGE_SIZE = 50
+ROUNDS = 200
+
+def make_page(size: int = PAGE_SIZE) -> dict:
+    """Build a list_products result shaped like real catalog data"""
+    items = []
+    for i in range(size):
+        items.append({
+            "_id": str(ObjectId()),
+            "product_id": i + 1,
+            "name": f"Product {i}",
+            "description": "Freshly baked with butter, flour and a lot of care. " * 4,
+            "price": 250.0 + i,
+            "category": "Cakes",
+            "available": True,
+            "discount": 10.0,
+            "tags": ["eggless", "bestseller", "birthday"],
+            "images": [f"/uploads/product-{i}-{n}.jpg" for n in range(3)],
+            "theme": "Birthday",
+            "flavour": "Chocolate",
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        })
+    return {
+        "items": items,
+        "pagination": {
+            "page": 1,
+            "limit": size,
+            "total_items": 500,
+            "total_pages": 10,
+            "has_next": True,
+            "has_prev": False,
+            "next_cursor": "WyJQcm9kdWN0IDQ5IiwiNjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2Il0"
+        },
+        "facets": None
+    }
+
+def default_path(content: dict) -> bytes:
+    """What FastAPI does with response_model=ProductListResponse"""
+    validated = ProductListResponse.model_validate(content)
+    encoded = jsonable_encoder(validated.model_dump(mode="json"))
+    # JSONResponse.render
+    return json.dumps(encoded, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def fast_path(content: dict) -> bytes:
+    """FAST_LIST_RESPONSES path: reshape and encode with orjson"""
+    return dumps(fast_product_list(content))
+
+def main() -> None:
+    content = make_page()
+    
+    # Both paths must produce the same document
+    assert json.loads(default_path(content)) == json.loads(fast_path(content))
+    
+    print(f"Serializing a {PAGE_SIZE}-item product page, {ROUNDS} rounds")
+    results = {}
+    for name, func in (("default", default_path), ("fast", fast_path)):
+        seconds = min(timeit.repeat(lambda: func(content), number=ROUNDS, repeat=5))
+        results[name] = seconds / ROUNDS
+        print(f"  {name:<8} {results[name] * 1e6:10.1f} us/response")
+    print(f"  speedup  {results['default'] / results['fast']:10.1f}x")
+
+if __name__ == "__main__":
+    main()
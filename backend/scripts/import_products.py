@@ -0,0 +1,38 @@
+"""
+Bulk import products from a CSV or XLSX spreadsheet
+
+Run from the backend directory:
+    python -m scripts.import_products path/to/products.xlsx [--batch-size 500]
+
+Required columns: name, description, price, category, theme, flavour.
+Optional columns: product_id, slug, available, discount, tags, images.
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from app.database import connect_db, close_db
+from app.importer import IMPORT_BATCH_SIZE, import_products, iter_spreadsheet_rows
+
+async def main(path: str, batch_size: int) -> int:
+    """Import the file and print the report, returning a process exit code"""
+    database = await connect_db()
+    try:
+        with open(path, "rb") as stream:
+            try:
+                report = await import_products(database, iter_spreadsheet_rows(stream, path), batch_size)
+            except ValueError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return 2
+    finally:
+        close_db()
+    print(json.dumps(report, indent=2))
+    return 1 if report["failed"] else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="CSV or XLSX file with one product per row")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="Rows per batched insert")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.path, args.batch_size)))
@@ -0,0 +1,45 @@
+"""
+Build the indexes declared in app/indexes.py that don't exist yet
+
+Run from the backend directory after deploying a release that declares
+new indexes, instead of letting every worker build them at startup:
+    python -m scripts.manage_indexes [--check]
+
+With --check nothing is built; the exit code is 1 if indexes are missing.
+"""
+import argparse
+import asyncio
+import sys
+
+from app.database import connect_db, close_db
+from app.indexes import diff_indexes, ensure_indexes
+
+async def main(check: bool) -> int:
+    """Print the index diff and build what is missing, returning a process exit code"""
+    database = await connect_db()
+    try:
+        diff = await diff_indexes(database)
+        for collection, entry in diff.items():
+            for name in entry["missing"]:
+                print(f"missing  {collection}.{name}")
+            for name in entry["extra"]:
+                # Not dropped automatically, it may be in use by something else
+                print(f"extra    {collection}.{name}")
+        missing = any(entry["missing"] for entry in diff.values())
+        if not missing:
+            print("All declared indexes exist")
+            return 0
+        if check:
+            return 1
+        for collection, names in (await ensure_indexes(database)).items():
+            for name in names:
+                print(f"built    {collection}.{name}")
+        return 0
+    finally:
+        close_db()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="Only report missing indexes")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.check)))
@@ -0,0 +1,33 @@
+"""
+Recompute the product counts stored on each category and the available
+product counters used for pagination totals
+
+The API keeps these counts up to date on every product write; run this
+after editing products directly in MongoDB, or on a schedule (e.g. a
+nightly cron job) to correct drift. Workers don't run it at
+startup: it would delay readiness and, during a rolling deploy, race with
+the increments of workers still serving.
+
+Run from the backend directory:
+    python -m scripts.reconcile_category_counts
+"""
+import asyncio
+
+from app.database import connect_db, close_db, bump_catalog_version
+from app.database import reconcile_category_counts, reconcile_available_counts
+
+async def main() -> int:
+    """Reconcile the counts and let running workers drop stale category lists"""
+    database = await connect_db()
+    try:
+        corrected = await reconcile_category_counts(database)
+        corrected += await reconcile_available_counts(database)
+        if corrected:
+            await bump_catalog_version(database)
+        return corrected
+    finally:
+        close_db()
+
+if __name__ == "__main__":
+    corrected = asyncio.run(main())
+    print(f"Corrected {corrected} category counts and available product counters")
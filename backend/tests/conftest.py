@@ -9,7 +9,10 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from fastapi.testclient import TestClient
 
 from app.main import app
-from app.database import init_db
+from app.database import product_id_allocator, catalog_write_clock
+from app.indexes import ensure_indexes
+from app.cache import catalog_cache, category_resolver, catalog_version
+from app.snapshot import catalog_snapshot
 
 # Test database name
 TEST_DB_NAME = "laxmi_bakery_test"
@@ -43,7 +46,15 @@ async def test_db():
     app.categories = test_db.categories
     
     # Initialize indexes
-    await init_db()
+    await ensure_indexes(test_db)
+    
+    # Start every test with an empty catalog cache
+    catalog_cache.clear()
+    category_resolver.invalidate()
+    catalog_version.reset()
+    catalog_snapshot.invalidate()
+    product_id_allocator.reset()
+    catalog_write_clock.reset()
     
     yield test_db
     
@@ -75,10 +86,10 @@ async def admin_token(test_client):
     }
     
     # Register admin
-    await test_client.post("/auth/register", json=admin_data)
+    await test_client.post("/api/auth/register", json=admin_data)
     
     # Login and get token
-    response = await test_client.post("/auth/login", data={
+    response = await test_client.post("/api/auth/login", data={
         "username": admin_data["email"],
         "password": admin_data["password"]
     })
@@ -0,0 +1,87 @@
+"""
+Tests for the catalog read cache
+"""
+import time
+
+from app.cache import CatalogCache, CatalogVersion, catalog_cache
+from app.utils.conditional import etag_matches
+
+def test_cache_hit_and_miss_counters():
+    """Test that lookups are counted as hits or misses"""
+    cache = CatalogCache(max_entries=10, ttl=60)
+    assert cache.get("key") is None
+    cache.set("key", {"value": 1})
+    assert cache.get("key") == {"value": 1}
+    
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+def test_cache_evicts_least_recently_used():
+    """Test LRU eviction once the size bound is reached"""
+    cache = CatalogCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now the least recently used entry
+    cache.set("c", 3)
+    
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_cache_entries_expire():
+    """Test that entries are dropped after their TTL"""
+    cache = CatalogCache(max_entries=10, ttl=0.01)
+    cache.set("key", 1)
+    time.sleep(0.02)
+    assert cache.get("key") is None
+
+def test_cache_invalidates_by_tag():
+    """Test that invalidation only drops entries carrying the given tags"""
+    cache = CatalogCache(max_entries=10, ttl=60)
+    cache.set("cakes", 1, tags=["category:cakes"])
+    cache.set("breads", 2, tags=["category:breads"])
+    
+    assert cache.invalidate_tags("category:cakes") == 1
+    assert cache.get("cakes") is None
+    assert cache.get("breads") == 2
+
+def test_cache_skips_stale_loads():
+    """Test that a value loaded before an invalidation is not stored"""
+    cache = CatalogCache(max_entries=10, ttl=60)
+    generation = cache.generation
+    cache.invalidate_tags("products:all")
+    cache.set("key", 1, generation=generation)
+    assert cache.get("key") is None
+
+def test_catalog_version_etag():
+    """Test that the ETag only moves forward with the catalog version"""
+    version = CatalogVersion()
+    assert version.observe(3) is True
+    assert version.observe(2) is False
+    assert version.etag() == '"catalog-3"'
+
+def test_catalog_version_gap_drops_local_entries():
+    """Test that skipping another worker's version drops every local entry"""
+    version = CatalogVersion()
+    version.observe(3)
+    catalog_cache.set("key", 1)
+    
+    # Our own bump right after the observed version keeps other entries
+    version.observe_own_bump(3, 4)
+    assert catalog_cache.get("key") == 1
+    
+    # Another worker bumped to 5 in between
+    version.observe_own_bump(4, 6)
+    assert catalog_cache.get("key") is None
+    assert version.etag() == '"catalog-6"'
+
+def test_etag_matches_if_none_match():
+    """Test If-None-Match parsing with lists, weak tags and wildcards"""
+    etag = '"catalog-3"'
+    assert etag_matches('"catalog-3"', etag)
+    assert etag_matches('"catalog-1", W/"catalog-3"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"catalog-2"', etag)
+    assert not etag_matches(None, etag)
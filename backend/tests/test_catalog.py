@@ -0,0 +1,48 @@
+"""
+Tests for the catalog snapshot endpoint
+"""
+import pytest
+from httpx import AsyncClient
+
+pytestmark = pytest.mark.asyncio
+
+async def test_catalog_snapshot(test_client: AsyncClient, test_db):
+    """Test the pre-rendered catalog snapshot and its encodings"""
+    await test_db.categories.insert_one({
+        "name": "Cakes",
+        "description": "Cakes for every occasion",
+        "slug": "cakes",
+        "images": []
+    })
+    await test_db.products.insert_many([
+        {
+            "product_id": i,
+            "name": f"Cake {i}",
+            "description": "Description",
+            "price": 500.0,
+            "category": "Cakes",
+            "available": i != 2,
+            "theme": "Birthday",
+            "flavour": "Vanilla"
+        }
+        for i in (1, 2)
+    ])
+    
+    # Uncompressed snapshot only lists available products
+    response = await test_client.get("/api/catalog/snapshot", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    categories = response.json()["categories"]
+    assert [product["product_id"] for product in categories[0]["products"]] == [1]
+    
+    # Gzip variant is negotiated and carries its own ETag
+    response = await test_client.get("/api/catalog/snapshot", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].endswith('-gzip"')
+    
+    # Unchanged snapshot revalidates with 304
+    response = await test_client.get(
+        "/api/catalog/snapshot",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]}
+    )
+    assert response.status_code == 304
@@ -0,0 +1,49 @@
+"""
+Tests for category endpoints
+"""
+import pytest
+from httpx import AsyncClient
+
+from app.database import reconcile_category_counts
+
+pytestmark = pytest.mark.asyncio
+
+async def test_category_product_counts(test_client: AsyncClient, test_db, admin_token):
+    """Test maintained product counts and the delete guard"""
+    result = await test_db.categories.insert_one({
+        "name": "Cakes",
+        "description": "Cakes for every occasion",
+        "slug": "cakes",
+        "images": []
+    })
+    products = await test_db.products.insert_many([
+        {
+            "product_id": i,
+            "name": f"Cake {i}",
+            "description": "Description",
+            "price": 100.0,
+            "category": "Cakes",
+            "available": i != 2,
+            "theme": "Birthday",
+            "flavour": "Vanilla"
+        }
+        for i in (1, 2)
+    ])
+    
+    # Products inserted behind the API's back are picked up by reconciliation
+    assert await reconcile_category_counts(test_db) == 1
+    response = await test_client.get("/api/categories")
+    category = response.json()["items"][0]
+    assert (category["product_count"], category["available_count"]) == (2, 1)
+    
+    # Product writes keep the counts current
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await test_client.delete(f"/api/products/{products.inserted_ids[0]}", headers=headers)
+    assert response.status_code == 204
+    response = await test_client.get("/api/categories")
+    category = response.json()["items"][0]
+    assert (category["product_count"], category["available_count"]) == (1, 0)
+    
+    # Categories that still have products can't be deleted
+    response = await test_client.delete(f"/api/categories/{result.inserted_id}", headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,55 @@
+"""
+Tests for response compression helpers
+"""
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.compression import CompressedBodyMemo, CompressionMiddleware, _strip_variant_suffixes
+from app.utils.encoding import choose_encoding, variant_etag
+
+def test_choose_encoding_respects_q_values():
+    """Test Accept-Encoding negotiation"""
+    assert choose_encoding(None) is None
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("br;q=0.5, gzip;q=0.8", ("br", "gzip")) == "gzip"
+    assert choose_encoding("gzip;q=0", ("gzip",)) is None
+    assert choose_encoding("*", ("br", "gzip")) == "br"
+
+def test_variant_etags_round_trip():
+    """Test that compressed ETags map back to the route's ETag"""
+    etag = '"catalog-7"'
+    assert variant_etag(etag, None) == etag
+    assert variant_etag(etag, "gzip") == '"catalog-7-gzip"'
+    assert _strip_variant_suffixes('"catalog-7-gzip", W/"catalog-6-br"') == '"catalog-7", W/"catalog-6"'
+
+def test_compressed_body_memo_is_bounded():
+    """Test that the memo evicts least recently used bodies over budget"""
+    memo = CompressedBodyMemo(max_bytes=10)
+    memo.set((b"a", "gzip"), b"123456")
+    memo.set((b"b", "gzip"), b"123456")
+    assert memo.get((b"a", "gzip")) is None
+    assert memo.get((b"b", "gzip")) == b"123456"
+    assert memo.size == 6
+
+def test_not_modified_keeps_variant_etag():
+    """Test that a 304 carries the same ETag as the 200 the client holds"""
+    def catalog(request):
+        if request.headers.get("if-none-match") == '"catalog-7"':
+            return Response(status_code=304, headers={"ETag": '"catalog-7"'})
+        return Response(b"x" * 2048, media_type="application/json", headers={"ETag": '"catalog-7"'})
+    app = Starlette(routes=[Route("/catalog", catalog)])
+    app.add_middleware(CompressionMiddleware)
+    client = TestClient(app)
+    
+    response = client.get("/catalog", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["etag"] == '"catalog-7-gzip"'
+    response = client.get("/catalog", headers={"Accept-Encoding": "gzip", "If-None-Match": '"catalog-7-gzip"'})
+    assert response.status_code == 304
+    assert response.headers["etag"] == '"catalog-7-gzip"'
+    
+    # Clients holding the uncompressed representation keep its ETag
+    response = client.get("/catalog", headers={"Accept-Encoding": "gzip", "If-None-Match": '"catalog-7"'})
+    assert response.status_code == 304
+    assert response.headers["etag"] == '"catalog-7"'
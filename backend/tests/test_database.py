@@ -0,0 +1,119 @@
+"""
+Tests for database helpers
+"""
+import os
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.database import ProductIdAllocator, PoolStats, get_available_product_count, reconcile_available_counts
+from app.database import bump_catalog_version, catalog_reads, catalog_read_session, catalog_write_clock
+from app.indexes import check_indexes_on_startup, diff_indexes, ensure_indexes
+
+pytestmark = pytest.mark.asyncio
+
+# Optional three-node replica set, e.g. the one described in the README
+REPLICA_SET_URI = os.getenv("MONGODB_REPLICA_SET_URI")
+
+async def test_product_id_allocator_reserves_blocks(test_db):
+    """Test that product numbers are handed out from reserved blocks"""
+    allocator = ProductIdAllocator(block_size=10)
+    
+    # First call reserves 1-10, the next ones are served from memory
+    assert await allocator.allocate(test_db) == [1]
+    assert await allocator.allocate(test_db, 3) == [2, 3, 4]
+    counter = await test_db.counters.find_one({"_id": "product_id"})
+    assert counter["seq"] == 10
+    
+    # Crossing the block boundary reserves a new block
+    assert await allocator.allocate(test_db, 8) == list(range(5, 13))
+    counter = await test_db.counters.find_one({"_id": "product_id"})
+    assert counter["seq"] == 20
+    
+    # Another worker never gets numbers from this worker's block
+    other = ProductIdAllocator(block_size=10)
+    assert await other.allocate(test_db) == [21]
+
+async def test_reconcile_available_counts(test_db):
+    """Test that drifted available product counters are corrected"""
+    await test_db.products.insert_many([
+        {"product_id": i, "name": f"Cake {i}", "category": "Cakes", "available": i != 3}
+        for i in (1, 2, 3)
+    ])
+    assert await get_available_product_count(test_db) == 2
+    assert await get_available_product_count(test_db, "Cakes") == 2
+    
+    # Simulate an increment lost while the counters were being seeded
+    await test_db.products.insert_one({"product_id": 4, "name": "Cake 4", "category": "Cakes", "available": True})
+    assert await reconcile_available_counts(test_db) == 2
+    assert await get_available_product_count(test_db) == 3
+    assert await get_available_product_count(test_db, "Cakes") == 3
+    
+    # Counters that are already right are left alone
+    assert await reconcile_available_counts(test_db) == 0
+
+async def test_pool_stats_tracks_checkouts():
+    """Test that pool events are turned into checkout counters"""
+    stats = PoolStats()
+    
+    stats.connection_created(None)
+    stats.connection_check_out_started(None)
+    stats.connection_checked_out(None)
+    snapshot = stats.snapshot()
+    assert snapshot["connections_open"] == 1
+    assert snapshot["connections_in_use"] == 1
+    assert snapshot["checkouts"] == 1
+    assert snapshot["checkout_wait_seconds_max"] >= 0
+    
+    # A failed checkout (pool exhausted) is counted separately
+    stats.connection_check_out_started(None)
+    stats.connection_check_out_failed(None)
+    stats.connection_checked_in(None)
+    snapshot = stats.snapshot()
+    assert snapshot["checkout_failures"] == 1
+    assert snapshot["connections_in_use"] == 0
+
+@pytest.mark.skipif(not REPLICA_SET_URI, reason="MONGODB_REPLICA_SET_URI is not set")
+async def test_catalog_reads_include_latest_write():
+    """Test that secondary catalog reads never miss a write this worker made"""
+    client = AsyncIOMotorClient(REPLICA_SET_URI)
+    database = client["laxmi_bakery_replica_test"]
+    catalog_write_clock.reset()
+    try:
+        for number in range(1, 21):
+            await database.products.insert_one({"product_id": number, "name": f"Cake {number}"})
+            # Every catalog write path ends with this bump
+            await bump_catalog_version(database)
+            assert catalog_write_clock.operation_time is not None
+            
+            async with catalog_read_session(database) as session:
+                product = await catalog_reads(database.products).find_one({"product_id": number}, session=session)
+            assert product is not None
+    finally:
+        catalog_write_clock.reset()
+        await client.drop_database("laxmi_bakery_replica_test")
+        client.close()
+
+async def test_ensure_indexes_builds_only_missing(test_db):
+    """Test that the index registry is diffed by name and only gaps are built"""
+    # The fixture already built every declared index
+    diff = await diff_indexes(test_db)
+    assert all(not entry["missing"] for entry in diff.values())
+    assert await ensure_indexes(test_db) == {}
+    
+    await test_db.products.drop_index("available_1_price_1")
+    await test_db.products.create_index("legacy_field")
+    diff = await diff_indexes(test_db)
+    assert diff["products"] == {"missing": ["available_1_price_1"], "extra": ["legacy_field_1"]}
+    
+    # Unknown indexes are reported but left alone
+    assert await ensure_indexes(test_db) == {"products": ["available_1_price_1"]}
+    assert (await diff_indexes(test_db))["products"]["extra"] == ["legacy_field_1"]
+
+async def test_startup_builds_missing_unique_indexes(test_db):
+    """Test that verify mode builds unique indexes but leaves the rest to the CLI"""
+    await test_db.products.drop_index("product_id_1")
+    await test_db.products.drop_index("available_1_price_1")
+    
+    await check_indexes_on_startup(test_db, "verify")
+    assert (await diff_indexes(test_db))["products"]["missing"] == ["available_1_price_1"]
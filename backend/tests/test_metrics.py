@@ -0,0 +1,43 @@
+"""
+Tests for the Prometheus metrics helpers
+"""
+from types import SimpleNamespace
+
+from app.metrics import Histogram, MongoCommandMetrics, snapshot_metrics
+import app.metrics as metrics_module
+
+def test_histogram_renders_cumulative_buckets():
+    """Test the exposition of a labelled histogram"""
+    histogram = Histogram("test_seconds", "Test latency", ("route",), (0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5, "/a")
+    
+    lines = histogram.render()
+    assert 'laxmi_test_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'laxmi_test_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'laxmi_test_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'laxmi_test_seconds_count{route="/a"} 3' in lines
+    assert 'laxmi_test_seconds_sum{route="/a"} 5.55' in lines
+
+def test_command_listener_labels_by_collection(monkeypatch):
+    """Test that command durations are recorded per collection and command"""
+    histogram = Histogram("mongo_seconds", "Test", ("collection", "command", "outcome"), (0.001, 0.01))
+    monkeypatch.setattr(metrics_module, "mongo_command_duration", histogram)
+    listener = MongoCommandMetrics()
+    
+    listener.started(SimpleNamespace(
+        command={"getMore": 42, "collection": "products"},
+        command_name="getMore", request_id=1, connection_id=("localhost", 27017)
+    ))
+    listener.succeeded(SimpleNamespace(
+        command_name="getMore", request_id=1, connection_id=("localhost", 27017), duration_micros=5000
+    ))
+    assert 'laxmi_mongo_seconds_count{collection="products",command="getMore",outcome="success"} 1' in histogram.render()
+
+def test_snapshot_metrics_skips_non_numeric_values():
+    """Test that stats snapshots are exposed value by value"""
+    lines = snapshot_metrics("cache", {"hits": 3, "mode": "polling", "hit_ratio": 0.75})
+    assert "laxmi_cache_hits 3" in lines
+    assert "laxmi_cache_hit_ratio 0.75" in lines
+    assert not any("mode" in line for line in lines)
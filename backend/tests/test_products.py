@@ -185,4 +185,428 @@ async def test_delete_product(test_client: AsyncClient, test_db, admin_token):
     
     # Verify product is deleted
     product = await test_db.products.find_one({"_id": ObjectId(product_id)})
-    assert product is None 
\ No newline at end of file
+    assert product is None 
+
+
+async def test_list_products_cursor_pagination(test_client: AsyncClient, test_db):
+    """Test walking the product list with keyset cursors"""
+    # Insert products with duplicate names so the _id tie-breaker is exercised
+    products = [
+        {
+            "product_id": i,
+            "name": f"Product {i % 3}",
+            "description": "Description",
+            "price": 10.0 + i,
+            "category": "Cakes",
+            "available": True,
+            "theme": "Birthday",
+            "flavour": "Vanilla"
+        }
+        for i in range(7)
+    ]
+    await test_db.products.insert_many(products)
+    
+    # Follow next_cursor until the listing is exhausted
+    seen = []
+    params = {"limit": 3}
+    while True:
+        response = await test_client.get("/api/products", params=params)
+        assert response.status_code == 200
+        data = response.json()
+        seen.extend(item["product_id"] for item in data["items"])
+        next_cursor = data["pagination"]["next_cursor"]
+        if not next_cursor:
+            break
+        params = {"limit": 3, "cursor": next_cursor}
+    
+    # Every product appears exactly once
+    assert sorted(seen) == list(range(7))
+    
+    # Malformed cursors are rejected
+    response = await test_client.get("/api/products", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+async def test_list_products_category_resolution(test_client: AsyncClient, test_db):
+    """Test case-insensitive category filtering by name or slug"""
+    await test_db.categories.insert_one({
+        "name": "Cup Cakes",
+        "description": "Cupcakes in many flavours",
+        "slug": "cupcakes",
+        "images": []
+    })
+    await test_db.products.insert_one({
+        "product_id": 1,
+        "name": "Vanilla Cupcake",
+        "description": "Description",
+        "price": 120.0,
+        "category": "Cup Cakes",
+        "available": True,
+        "theme": "Birthday",
+        "flavour": "Vanilla"
+    })
+    
+    # Name and slug resolve regardless of letter case
+    for category in ("cup cakes", "CUPCAKES"):
+        response = await test_client.get("/api/products", params={"category": category})
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 1
+    
+    # Regex metacharacters are treated literally
+    response = await test_client.get("/api/products", params={"category": ".*"})
+    assert response.status_code == 200
+    assert response.json()["items"] == []
+
+async def test_search_products(test_client: AsyncClient, test_db):
+    """Test relevance-ranked full-text product search"""
+    products = [
+        {
+            "product_id": 1,
+            "name": "Chocolate Cake",
+            "description": "Rich chocolate sponge with chocolate ganache",
+            "price": 900.0,
+            "category": "Cakes",
+            "available": True,
+            "theme": "Birthday",
+            "flavour": "Chocolate"
+        },
+        {
+            "product_id": 2,
+            "name": "Vanilla Cake",
+            "description": "Light sponge with a hint of chocolate",
+            "price": 800.0,
+            "category": "Cakes",
+            "available": True,
+            "theme": "Birthday",
+            "flavour": "Vanilla"
+        },
+        {
+            "product_id": 3,
+            "name": "Butter Cookies",
+            "description": "Crisp butter cookies",
+            "price": 300.0,
+            "category": "Cookies",
+            "available": True,
+            "theme": "Classic",
+            "flavour": "Butter"
+        }
+    ]
+    await test_db.products.insert_many(products)
+    
+    response = await test_client.get("/api/products/search", params={"q": "chocolate"})
+    assert response.status_code == 200
+    data = response.json()
+    
+    # Only matching products are returned, best match first
+    assert [item["product_id"] for item in data["items"]] == [1, 2]
+    assert data["items"][0]["score"] > data["items"][1]["score"]
+    assert data["pagination"]["has_next"] is False
+
+async def test_list_products_filters_and_facets(test_client: AsyncClient, test_db):
+    """Test attribute filters and facet counts on the product list"""
+    products = [
+        {
+            "product_id": i,
+            "name": f"Product {i}",
+            "description": "Description",
+            "price": 200.0 * (i + 1),
+            "category": "Cakes",
+            "available": True,
+            "discount": 10 if i % 2 else 0,
+            "tags": ["eggless"] if i < 2 else [],
+            "theme": "Wedding" if i % 2 else "Birthday",
+            "flavour": "Chocolate"
+        }
+        for i in range(4)
+    ]
+    await test_db.products.insert_many(products)
+    
+    # Filters are combined with AND
+    response = await test_client.get("/api/products", params={"theme": "Wedding", "min_price": 500})
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["product_id"] for item in data["items"]] == [3]
+    assert data["facets"] is None
+    
+    # Facets describe every matching product, not only the current page
+    response = await test_client.get("/api/products", params={"facets": "true", "limit": 1})
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["items"]) == 1
+    assert data["pagination"]["total_items"] == 4
+    assert {"value": "Birthday", "count": 2} in data["facets"]["themes"]
+    assert data["facets"]["tags"] == [{"value": "eggless", "count": 2}]
+    assert data["facets"]["discounted"] == 2
+
+async def test_product_sparse_fieldsets(test_client: AsyncClient, test_db):
+    """Test fetching only the requested product fields"""
+    product = {
+        "product_id": 1,
+        "name": "Black Forest",
+        "description": "A long description the card grid never shows",
+        "price": 950.0,
+        "category": "Cakes",
+        "available": True,
+        "discount": 5,
+        "images": ["/uploads/first.jpg", "/uploads/second.jpg"],
+        "theme": "Birthday",
+        "flavour": "Chocolate"
+    }
+    result = await test_db.products.insert_one(product)
+    
+    # List cards get the first image only
+    response = await test_client.get("/api/products", params={"fields": "price,discount,image"})
+    assert response.status_code == 200
+    item = response.json()["items"][0]
+    assert item == {"name": "Black Forest", "price": 950.0, "discount": 5, "images": ["/uploads/first.jpg"]}
+    
+    # Single product reads accept the same parameter
+    response = await test_client.get(f"/api/products/{result.inserted_id}", params={"fields": "price"})
+    assert response.status_code == 200
+    assert response.json() == {"name": "Black Forest", "price": 950.0}
+    
+    # Unknown fields are rejected
+    response = await test_client.get("/api/products", params={"fields": "password"})
+    assert response.status_code == 400
+
+async def test_batch_get_products(test_client: AsyncClient, test_db):
+    """Test resolving several product ids in one request"""
+    products = [
+        {
+            "product_id": i,
+            "name": f"Product {i}",
+            "description": "Description",
+            "price": 100.0 * i,
+            "category": "Cakes",
+            "available": True,
+            "theme": "Birthday",
+            "flavour": "Vanilla"
+        }
+        for i in (1, 2)
+    ]
+    result = await test_db.products.insert_many(products)
+    first_id = str(result.inserted_ids[0])
+    
+    ids = ",".join(["2", first_id, "404", "not-an-id", "²", str(10**20)])
+    response = await test_client.get("/api/products/batch", params={"ids": ids})
+    assert response.status_code == 200
+    items = response.json()["items"]
+    
+    # Results come back in request order with per-id markers
+    assert [item["id"] for item in items] == ["2", first_id, "404", "not-an-id", "²", str(10**20)]
+    assert items[0]["product"]["product_id"] == 2
+    assert items[1]["product"]["product_id"] == 1
+    assert items[2] == {"id": "404", "found": False, "product": None, "error": "not_found"}
+    assert items[3]["error"] == "invalid_id"
+    assert items[4]["error"] == "invalid_id"  # Not accepted by int()
+    assert items[5]["error"] == "invalid_id"  # Too large for BSON
+
+async def test_export_products(test_client: AsyncClient, test_db, admin_token):
+    """Test streaming the catalog as NDJSON and CSV"""
+    products = [
+        {
+            "product_id": i,
+            "name": f"Product {i}",
+            "description": "Description",
+            "price": 100.0,
+            "category": "Cakes",
+            "available": i == 1,
+            "tags": ["eggless", "fresh"],
+            "theme": "Birthday",
+            "flavour": "Vanilla"
+        }
+        for i in (1, 2)
+    ]
+    await test_db.products.insert_many(products)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    
+    # NDJSON includes unavailable products too
+    response = await test_client.get("/api/products/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.strip().split("\n")
+    assert len(lines) == 2
+    
+    # CSV has a header row and flattens lists
+    response = await test_client.get("/api/products/export", params={"format": "csv"}, headers=headers)
+    assert response.status_code == 200
+    rows = response.text.strip().splitlines()
+    assert rows[0].startswith("_id,product_id,slug,name")
+    assert "eggless|fresh" in rows[1]
+    
+    # Export is admin only
+    response = await test_client.get("/api/products/export")
+    assert response.status_code == 401
+
+async def test_get_product_by_number_and_slug(test_client: AsyncClient, test_db):
+    """Test product lookups by integer product number and slug"""
+    await test_db.products.insert_one({
+        "product_id": 42,
+        "slug": "black-forest-cake-42",
+        "name": "Black Forest Cake",
+        "description": "Description",
+        "price": 100.0,
+        "category": "Cakes",
+        "available": True,
+        "theme": "Birthday",
+        "flavour": "Chocolate"
+    })
+    
+    response = await test_client.get("/api/products/by-number/42")
+    assert response.status_code == 200
+    assert response.json()["slug"] == "black-forest-cake-42"
+    
+    # Slugs are matched case-insensitively
+    response = await test_client.get("/api/products/by-slug/Black-Forest-Cake-42")
+    assert response.status_code == 200
+    assert response.json()["product_id"] == 42
+    
+    assert (await test_client.get("/api/products/by-number/43")).status_code == 404
+    assert (await test_client.get("/api/products/by-number/abc")).status_code == 422
+    assert (await test_client.get("/api/products/by-slug/missing")).status_code == 404
+    assert (await test_client.get(f"/api/products/by-number/{10**20}")).status_code == 422
+
+async def test_import_products(test_client: AsyncClient, test_db, admin_token):
+    """Test bulk import from CSV with a per-row error report"""
+    await test_db.categories.insert_one({
+        "name": "Cakes",
+        "description": "Cakes for every occasion",
+        "slug": "cakes",
+        "images": []
+    })
+    body = (
+        "Name,Description,Price,Category,Theme,Flavor,Tags\n"
+        "Black Forest,Description,500,cakes,Birthday,Chocolate,eggless|fresh\n"
+        "Broken,Description,abc,Cakes,Birthday,Vanilla,\n"
+        "Bread,Description,100,Breads,Daily,Plain,\n"
+    )
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    
+    response = await test_client.post(
+        "/api/products/import",
+        files={"file": ("products.csv", body.encode(), "text/csv")},
+        headers=headers
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert report["inserted"] == 1
+    assert report["failed"] == 2
+    assert [error["row"] for error in report["errors"]] == [3, 4]
+    
+    product = await test_db.products.find_one({"name": "Black Forest"})
+    assert product["category"] == "Cakes"
+    assert product["tags"] == ["eggless", "fresh"]
+    assert product["slug"] == f"black-forest-{product['product_id']}"
+
+    # Explicit numbers the sequence already handed out are refused, and
+    # later numbers are allocated past the accepted ones
+    body = (
+        "ID,Name,Description,Price,Category,Theme,Flavor\n"
+        f"{product['product_id']},Taken,Description,500,Cakes,Birthday,Vanilla\n"
+        "1000,Numbered,Description,500,Cakes,Birthday,Vanilla\n"
+    )
+    response = await test_client.post(
+        "/api/products/import",
+        files={"file": ("products.csv", body.encode(), "text/csv")},
+        headers=headers
+    )
+    report = response.json()
+    assert report["inserted"] == 1
+    assert [error["row"] for error in report["errors"]] == [2]
+    counter = await test_db.counters.find_one({"_id": "product_id"})
+    assert counter["seq"] >= 1000
+
+    # Files without the required columns are rejected up front
+    response = await test_client.post(
+        "/api/products/import",
+        files={"file": ("products.csv", b"name\nCake\n", "text/csv")},
+        headers=headers
+    )
+    assert response.status_code == 400
+
+async def test_bulk_update_products(test_client: AsyncClient, test_db, admin_token):
+    """Test per-item and filter based bulk updates"""
+    await test_db.categories.insert_one({
+        "name": "Cup Cakes",
+        "description": "Small cakes",
+        "slug": "cup-cakes",
+        "images": []
+    })
+    await test_db.products.insert_many([
+        {
+            "product_id": i,
+            "name": f"Cupcake {i}",
+            "description": "Description",
+            "price": 100.0,
+            "category": "Cup Cakes",
+            "available": True,
+            "discount": 0,
+            "theme": "Birthday",
+            "flavour": "Vanilla"
+        }
+        for i in (1, 2)
+    ])
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    
+    # 10% off every cupcake
+    response = await test_client.patch(
+        "/api/products/bulk",
+        json={"filter": {"category": "cup-cakes"}, "update": {"discount": 10}},
+        headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()["modified"] == 2
+    
+    # Sold out at end of day, with per-item results
+    response = await test_client.patch(
+        "/api/products/bulk",
+        json={"items": [
+            {"id": "1", "update": {"available": False}},
+            {"id": "404", "update": {"available": False}}
+        ]},
+        headers=headers
+    )
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()["items"]] == ["updated", "not_found"]
+    
+    response = await test_client.get("/api/products", params={"category": "Cup Cakes"})
+    items = response.json()["items"]
+    assert [item["product_id"] for item in items] == [2]
+    assert items[0]["discount"] == 10
+    assert response.json()["pagination"]["total_items"] == 1
+    
+    # A filter without conditions would update the whole catalog
+    response = await test_client.patch(
+        "/api/products/bulk",
+        json={"filter": {}, "update": {"discount": 50}},
+        headers=headers
+    )
+    assert response.status_code == 422
+
+async def test_update_product_version_conflict(test_client: AsyncClient, test_db, admin_token):
+    """Test optimistic concurrency on product updates"""
+    result = await test_db.products.insert_one({
+        "product_id": 1,
+        "name": "Cake",
+        "description": "Description",
+        "price": 100.0,
+        "category": "Cakes",
+        "available": True,
+        "images": [],
+        "theme": "Birthday",
+        "flavour": "Vanilla"
+    })
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    url = f"/api/products/{result.inserted_id}"
+    
+    # Products written before versioning are at version 0
+    response = await test_client.put(url, data={"price": "120", "version": "0"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["version"] == 1
+    
+    # A second writer still holding version 0 is rejected
+    response = await test_client.put(url, data={"price": "90", "version": "0"}, headers=headers)
+    assert response.status_code == 409
+    
+    product = await test_db.products.find_one({"_id": result.inserted_id})
+    assert product["price"] == 120.0
+    assert product["version"] == 1
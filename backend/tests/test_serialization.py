@@ -0,0 +1,42 @@
+"""
+Tests for the fast list serialization path
+"""
+import json
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.utils.serialization import dumps, trusted_product
+from scripts.benchmark_serialization import make_page, default_path, fast_path
+
+def test_fast_path_matches_response_model():
+    """Test that the fast path produces the same JSON as response_model"""
+    content = make_page(size=5)
+    assert json.loads(fast_path(content)) == json.loads(default_path(content))
+
+def test_trusted_product_fills_defaults():
+    """Test that missing optional fields get ProductResponse defaults"""
+    product = {
+        "_id": ObjectId(),
+        "product_id": 1,
+        "name": "Croissant",
+        "description": "Flaky",
+        "price": 80.0,
+        "category": "Pastries",
+        "theme": "Classic",
+        "flavour": "Butter",
+        "created_at": datetime.utcnow()
+    }
+    shaped = trusted_product(product)
+    assert shaped["tags"] == []
+    assert shaped["available"] is True
+    assert "_id" not in shaped and "created_at" not in shaped
+
+def test_dumps_handles_bson_types():
+    """Test ObjectId and datetime encoding"""
+    object_id = ObjectId()
+    moment = datetime(2024, 1, 2, 3, 4, 5)
+    assert json.loads(dumps({"id": object_id, "at": moment})) == {
+        "id": str(object_id),
+        "at": "2024-01-02T03:04:05"
+    }
@@ -0,0 +1,88 @@
+"""
+Tests for slow query capture
+"""
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient
+
+from app.slow_queries import SlowQueryRecorder, query_shape, summarize_plan, slow_query_recorder
+
+def _run_command(recorder: SlowQueryRecorder, command: dict, duration_ms: float, request_id: int = 1) -> None:
+    """Feed one command through the listener callbacks"""
+    event = {
+        "request_id": request_id,
+        "connection_id": ("localhost", 27017),
+        "command_name": next(iter(command)),
+        "database_name": "laxmi_bakery"
+    }
+    recorder.started(SimpleNamespace(command=command, **event))
+    recorder.succeeded(SimpleNamespace(duration_micros=int(duration_ms * 1000), **event))
+
+def test_query_shape_hides_literal_values():
+    """Test that queries differing only in values share a shape"""
+    shape = query_shape("find", {
+        "find": "products",
+        "filter": {"available": True, "$or": [{"tags": {"$in": ["eggless"]}}, {"price": {"$lt": 500}}]},
+        "sort": {"name": 1},
+        "skip": 20
+    })
+    assert shape == {
+        "filter": {"available": "?", "$or": [{"tags": {"$in": "?"}}, {"price": {"$lt": "?"}}]},
+        "sort": {"name": 1},
+        "skip": "?"
+    }
+
+def test_recorder_keeps_only_slow_commands():
+    """Test the threshold and the skip warning"""
+    recorder = SlowQueryRecorder(threshold_ms=50)
+    _run_command(recorder, {"find": "products", "filter": {"name": "Cake"}}, 10, request_id=1)
+    _run_command(recorder, {"find": "products", "filter": {"name": "Pie"}, "skip": 400}, 80, request_id=2)
+    # Inserts have no query shape worth recording
+    _run_command(recorder, {"insert": "products", "documents": []}, 500, request_id=3)
+    
+    entries = recorder.recent()
+    assert len(entries) == 1
+    assert entries[0]["collection"] == "products"
+    assert entries[0]["shape"]["filter"] == {"name": "?"}
+    assert entries[0]["plan"] is None  # Not explained without an event loop
+    assert entries[0]["warnings"] == ["skip: 400 documents are read and thrown away; use a keyset cursor"]
+
+def test_recorder_bounds_per_shape_state():
+    """Test that explain bookkeeping and plans only cover recent shapes"""
+    recorder = SlowQueryRecorder(threshold_ms=0, max_entries=2)
+    for request_id, field in enumerate(["name", "price", "theme"]):
+        _run_command(recorder, {"find": "products", "filter": {field: 1}}, 10, request_id=request_id)
+        recorder.plans[recorder.entries[-1]["shape_id"]] = {"stages": ["COLLSCAN"], "indexes": []}
+        recorder._trim(recorder.plans)
+    
+    shape_ids = [entry["shape_id"] for entry in recorder.entries]
+    assert list(recorder._explained_at) == shape_ids
+    assert list(recorder.plans) == shape_ids
+
+def test_summarize_plan_reads_aggregate_explains():
+    """Test that plans nested in $cursor stages are found"""
+    plan = summarize_plan({"stages": [{"$cursor": {"queryPlanner": {"winningPlan": {
+        "stage": "FETCH",
+        "inputStage": {"stage": "IXSCAN", "indexName": "category_1_available_1_name_1__id_1"}
+    }}}}]})
+    assert plan == {"stages": ["FETCH", "IXSCAN"], "indexes": ["category_1_available_1_name_1__id_1"]}
+    assert summarize_plan({"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}})["stages"] == ["COLLSCAN"]
+
+@pytest.mark.asyncio
+async def test_slow_queries_endpoint_requires_admin(test_client: AsyncClient, test_db, admin_token):
+    """Test the admin listing of slow queries"""
+    response = await test_client.get("/api/admin/slow-queries")
+    assert response.status_code == 401
+    
+    slow_query_recorder.clear()
+    slow_query_recorder.record("laxmi_bakery_test", "find", {"find": "products", "filter": {}, "skip": 90}, 250)
+    response = await test_client.get(
+        "/api/admin/slow-queries",
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["flagged"] == 1
+    assert data["items"][0]["skip"] == 90
+    slow_query_recorder.clear()
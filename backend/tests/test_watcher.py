@@ -0,0 +1,124 @@
+"""
+Tests for cross-worker cache invalidation
+"""
+import asyncio
+
+import pytest
+from bson import ObjectId
+from bson.timestamp import Timestamp
+from httpx import AsyncClient
+
+from app.cache import CatalogCache, category_tag, product_tag, TAG_ALL_PRODUCTS, TAG_CATEGORIES
+from app.database import CatalogWriteClock, bump_catalog_version
+from app.watcher import CatalogChangeWatcher
+import app.watcher as watcher_module
+
+def test_watcher_drops_only_affected_entries(monkeypatch):
+    """Test that product update events invalidate by tag"""
+    cache = CatalogCache()
+    monkeypatch.setattr(watcher_module, "catalog_cache", cache)
+    product_id = ObjectId()
+    cache.set("item", 1, [product_tag(str(product_id))])
+    cache.set("cakes", 2, [category_tag("Cakes")])
+    cache.set("pies", 3, [category_tag("Pies")])
+    cache.set("all", 4, [TAG_ALL_PRODUCTS])
+    
+    CatalogChangeWatcher()._apply(None, {
+        "operationType": "update",
+        "ns": {"coll": "products"},
+        "documentKey": {"_id": product_id},
+        "updateDescription": {"updatedFields": {"price": 120}},
+        "fullDocument": {"_id": product_id, "category": "Cakes"}
+    })
+    assert [cache.get(key) for key in ("item", "cakes", "pies", "all")] == [None, None, 3, None]
+    
+    # Moving a product between categories drops everything
+    CatalogChangeWatcher()._apply(None, {
+        "operationType": "update",
+        "ns": {"coll": "products"},
+        "documentKey": {"_id": product_id},
+        "updateDescription": {"updatedFields": {"category": "Cakes"}},
+        "fullDocument": {"_id": product_id, "category": "Cakes"}
+    })
+    assert cache.get("pies") is None
+
+def test_watcher_category_count_updates_only_drop_category_lists(monkeypatch):
+    """Test that product count changes on categories don't wipe the cache"""
+    cache = CatalogCache()
+    monkeypatch.setattr(watcher_module, "catalog_cache", cache)
+    cache.set("categories", 1, [TAG_CATEGORIES])
+    cache.set("cakes", 2, [category_tag("Cakes")])
+    event = {
+        "operationType": "update",
+        "ns": {"coll": "categories"},
+        "documentKey": {"_id": ObjectId()}
+    }
+    
+    CatalogChangeWatcher()._apply(None, {
+        **event,
+        "updateDescription": {"updatedFields": {"product_count": 3, "available_count": 2}, "removedFields": []}
+    })
+    assert cache.get("categories") is None
+    assert cache.get("cakes") == 2
+    
+    # Renames still drop everything
+    CatalogChangeWatcher()._apply(None, {
+        **event,
+        "updateDescription": {"updatedFields": {"name": "Cup Cakes"}, "removedFields": []}
+    })
+    assert cache.get("cakes") is None
+
+def test_watcher_advances_catalog_write_clock(monkeypatch):
+    """Test that events from other workers move the catalog read floor forward"""
+    clock = CatalogWriteClock()
+    monkeypatch.setattr(watcher_module, "catalog_write_clock", clock)
+    event = {
+        "operationType": "update",
+        "ns": {"coll": "counters"},
+        "documentKey": {"_id": "catalog_version"},
+        "fullDocument": {"_id": "catalog_version", "seq": 1}
+    }
+    
+    CatalogChangeWatcher()._apply(None, {**event, "clusterTime": Timestamp(200, 1)})
+    assert clock.operation_time == Timestamp(200, 1)
+    
+    # Older events (e.g. replayed after a resume) never move it back
+    CatalogChangeWatcher()._apply(None, {**event, "clusterTime": Timestamp(100, 1)})
+    assert clock.operation_time == Timestamp(200, 1)
+
+@pytest.mark.asyncio
+async def test_watcher_sees_writes_from_other_workers(test_client: AsyncClient, test_db):
+    """Test that a write made outside this worker reaches its cache.
+    
+    Uses change streams on a replica set (e.g. a local single-node one)
+    and the version polling fallback on a standalone mongod.
+    """
+    watcher = CatalogChangeWatcher(poll_seconds=0.2)
+    watcher.start(test_db)
+    try:
+        await asyncio.sleep(0.5)
+        response = await test_client.get("/api/products")
+        assert response.json()["items"] == []
+        
+        # Simulate another worker: write directly and bump the version
+        await test_db.products.insert_one({
+            "product_id": 1,
+            "name": "Cake",
+            "description": "Description",
+            "price": 100.0,
+            "category": "Cakes",
+            "available": True,
+            "theme": "Birthday",
+            "flavour": "Vanilla"
+        })
+        await bump_catalog_version(test_db)
+        
+        for _ in range(50):
+            await asyncio.sleep(0.1)
+            response = await test_client.get("/api/products")
+            if response.json()["items"]:
+                break
+        assert len(response.json()["items"]) == 1
+        assert watcher.mode in ("change_stream", "polling")
+    finally:
+        await watcher.stop()